@@ -0,0 +1,64 @@
+"""
+Startup-time budget check for the `gob` entry point.
+
+Runs each command in a fresh interpreter with `python -X importtime` against an empty
+temporary HOME, sums the cumulative import time of the top-level imports and exits with
+status 1 if any command goes over its budget or imports a module it should not need.
+
+Usage:
+    python benchmarks/startup.py [--budget-ms 100] [--runs 5]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+# (arguments, modules that must not be imported)
+COMMANDS = [
+    (['--help'], ['requests', 'gob.cx', 'gob.tx', 'gob.wu', 'gob.search']),
+    (['cx', 'ls'], ['requests', 'gob.wu', 'gob.gh_api_common']),
+]
+
+def measure(args, home):
+    """Returns (total import time in ms, set of imported module names) for one run."""
+    env = dict(os.environ, HOME=home)
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-m', 'gob.cli'] + args,
+        env=env, capture_output=True, text=True, check=True,
+    )
+    total_us = 0
+    modules = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        modules.add(name.strip())
+        if not name.startswith('  '):
+            total_us += int(cumulative)
+    return total_us / 1000, modules
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--budget-ms', type=float, default=100, help='Import-time budget per command')
+    parser.add_argument('--runs', type=int, default=5, help='Runs per command, the fastest one counts')
+    options = parser.parse_args()
+
+    failed = False
+    with tempfile.TemporaryDirectory() as home:
+        for args, forbidden in COMMANDS:
+            runs = [measure(args, home) for _ in range(options.runs)]
+            best_ms = min(ms for ms, _ in runs)
+            imported = sorted(set(forbidden) & runs[0][1])
+            status = 'ok'
+            if best_ms > options.budget_ms or imported:
+                status = 'FAIL'
+                failed = True
+            line = f"{status:4}  gob {' '.join(args):10}  {best_ms:7.1f} ms (budget {options.budget_ms:.0f} ms)"
+            if imported:
+                line += f"  imports {', '.join(imported)}"
+            print(line)
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,218 @@
+"""
+Synthetic-workspace benchmarks for gob's filesystem and CLI paths.
+
+Generates a reproducible ~/.gob under a temporary HOME (customers with tickets, health
+checks and a .solved directory), runs the click commands in-process through CliRunner and
+reports latency percentiles, read/write I/O call counts and peak Python memory per command
+as JSON. The module-level caches (index connection, directory listings, GitHub client) are
+dropped before every run, so each run starts like a fresh `gob` process apart from the
+imports and the OS page cache. Results from two commits can be compared with --compare.
+
+Usage:
+    python benchmarks/workspace.py --size small --output before.json
+    python benchmarks/workspace.py --size small --compare before.json
+"""
+import argparse
+import collections
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from click.testing import CliRunner
+
+# name: (customers, open tickets, solved tickets, health-check files)
+SIZES = {
+    'tiny': (100, 1000, 500, 50),
+    'small': (1000, 20000, 10000, 200),
+    'medium': (5000, 100000, 50000, 500),
+    'large': (10000, 400000, 100000, 1000),
+}
+
+def generate_workspace(home, customers, open_tickets, solved_tickets, health_checks, seed=0):
+    """Creates a reproducible ~/.gob under home and returns a few names for the commands to use."""
+    rng = random.Random(seed)
+    gob_dir = os.path.join(home, '.gob')
+    customer_names = [f'Customer{number:05d}' for number in range(customers)]
+    words = ['error', 'timeout', 'replication', 'upgrade', 'ldap', 'saml', 'actions', 'runner',
+             'backup', 'restore', 'webhook', 'latency', 'disk', 'memory', 'elasticsearch', 'mysql']
+    for name in customer_names:
+        os.makedirs(os.path.join(gob_dir, name, 'tickets'))
+    tickets = []
+    for number in range(open_tickets):
+        ticket_id = str(100000 + number)
+        customer = rng.choice(customer_names)
+        ticket_path = os.path.join(gob_dir, customer, 'tickets', ticket_id)
+        os.mkdir(ticket_path)
+        with open(os.path.join(ticket_path, 'notes.md'), 'w') as notes_file:
+            notes_file.write('# Notes\n\n' + ' '.join(rng.choice(words) for _ in range(40)) + '\n')
+        with open(os.path.join(ticket_path, 'notes.sh'), 'w') as notes_file:
+            notes_file.write('#!/bin/bash\n\n# Notes for ticket\n')
+        tickets.append((customer, ticket_id))
+    solved_dir = os.path.join(gob_dir, '.solved')
+    os.makedirs(solved_dir)
+    for number in range(solved_tickets):
+        ticket_path = os.path.join(solved_dir, str(900000 + number))
+        os.mkdir(ticket_path)
+        with open(os.path.join(ticket_path, 'notes.md'), 'w') as notes_file:
+            notes_file.write('# Notes\n\n' + ' '.join(rng.choice(words) for _ in range(40)) + '\n')
+    health_dir = os.path.join(gob_dir, 'health-check', 'premium', 'health-checks')
+    this_year = time.localtime().tm_year
+    for number in range(health_checks):
+        year_dir = os.path.join(health_dir, str(this_year - number % 3))
+        os.makedirs(year_dir, exist_ok=True)
+        with open(os.path.join(year_dir, f'{rng.choice(customer_names)}-{number}.md'), 'w') as md_file:
+            md_file.write('# Health check\n')
+    return customer_names, tickets
+
+def read_io_calls():
+    """
+    Returns the process' read+write I/O call count (syscr + syscw in /proc/self/io), or None
+    where unavailable. Only read(2)/write(2)-style calls are counted, not stat, open or getdents.
+    """
+    try:
+        with open('/proc/self/io') as io_file:
+            counters = dict(line.split(': ') for line in io_file.read().splitlines())
+        return int(counters['syscr']) + int(counters['syscw'])
+    except (OSError, KeyError, ValueError):
+        return None
+
+def reset_process_caches():
+    """Drops the caches a long-lived process keeps between commands, so no run reuses the previous one's."""
+    from gob import index, gh_api_common
+    if index._connection is not None:
+        index._connection.close()
+        index._connection = None
+    index._listings.clear()
+    gh_api_common._client = None
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+def measure(runner, args, runs, input_for=None):
+    """
+    Runs one command repeatedly and summarises it.
+
+    Args:
+        runner (CliRunner): Runner with HOME pointing at the synthetic workspace.
+        args (callable): Returns the argument list for run number i.
+        runs (int): Number of timed runs. The first one is reported separately as the cold run.
+        input_for (str, optional): Input fed to prompts, e.g. 'y' for confirmations.
+    """
+    from gob.cli import main
+    latencies = []
+    io_calls = []
+    for run in range(runs):
+        reset_process_caches()
+        before = read_io_calls()
+        start = time.perf_counter()
+        result = runner.invoke(main, args(run), input=input_for, catch_exceptions=False)
+        latencies.append((time.perf_counter() - start) * 1000)
+        after = read_io_calls()
+        if before is not None:
+            io_calls.append(after - before)
+        if result.exit_code != 0:
+            raise RuntimeError(f"gob {' '.join(args(run))} failed: {result.output}")
+    reset_process_caches()
+    tracemalloc.start()
+    runner.invoke(main, args(runs), input=input_for)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    warm = latencies[1:] or latencies
+    return {
+        'cold_ms': round(latencies[0], 3),
+        'p50_ms': round(percentile(warm, 0.50), 3),
+        'p90_ms': round(percentile(warm, 0.90), 3),
+        'p99_ms': round(percentile(warm, 0.99), 3),
+        'mean_ms': round(statistics.mean(warm), 3),
+        'io_calls_median': int(statistics.median(io_calls)) if io_calls else None,
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
+
+def run_suite(size, runs, seed):
+    customers, open_tickets, solved_tickets, health_checks = SIZES[size]
+    results = {}
+    with tempfile.TemporaryDirectory() as home:
+        start = time.perf_counter()
+        _, tickets = generate_workspace(home, customers, open_tickets, solved_tickets, health_checks, seed)
+        generate_seconds = time.perf_counter() - start
+        runner = CliRunner(env={'HOME': home})
+        busiest = collections.Counter(customer for customer, _ in tickets).most_common(1)[0][0]
+        to_solve = [(customer, ticket_id) for customer, ticket_id in tickets if customer != busiest][:runs + 1]
+        commands = {
+            'tree': lambda run: ['tree'],
+            'cx ls': lambda run: ['cx', 'ls'],
+            'tx ls': lambda run: ['tx', 'ls', '-c', busiest],
+            'tx ls -s': lambda run: ['tx', 'ls', '-s'],
+            'tx solve': lambda run: ['tx', 'solve', '-c', to_solve[run][0], to_solve[run][1]],
+        }
+        for name, args in commands.items():
+            results[name] = measure(runner, args, runs, input_for='y\n' if name == 'tx solve' else None)
+    return {
+        'size': size,
+        'workspace': {'customers': customers, 'open_tickets': open_tickets,
+                      'solved_tickets': solved_tickets, 'health_checks': health_checks},
+        'generate_seconds': round(generate_seconds, 2),
+        'runs': runs,
+        'seed': seed,
+        'commit': git_commit(),
+        'python': sys.version.split()[0],
+        'results': results,
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+def compare(baseline, current, threshold):
+    """Prints p50 deltas per command and returns True if any command regressed by more than threshold."""
+    regressed = False
+    print(f"{'command':10}  {'before p50':>11}  {'after p50':>10}  change")
+    for name, after in current['results'].items():
+        before = baseline['results'].get(name)
+        if not before:
+            continue
+        change = (after['p50_ms'] - before['p50_ms']) / before['p50_ms'] if before['p50_ms'] else 0
+        flag = ''
+        if change > threshold:
+            flag = '  REGRESSION'
+            regressed = True
+        print(f"{name:10}  {before['p50_ms']:9.2f}ms  {after['p50_ms']:8.2f}ms  {change:+7.1%}{flag}")
+    return regressed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', choices=sorted(SIZES), default='tiny', help='Synthetic workspace size')
+    parser.add_argument('--runs', type=int, default=10, help='Timed runs per command')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the workspace generator')
+    parser.add_argument('--output', help='Write the JSON results to this file instead of stdout')
+    parser.add_argument('--compare', help='Baseline JSON results to compare against')
+    parser.add_argument('--threshold', type=float, default=0.10, help='Relative p50 slowdown counted as a regression')
+    options = parser.parse_args()
+
+    current = run_suite(options.size, options.runs, options.seed)
+    if options.output:
+        with open(options.output, 'w') as output_file:
+            json.dump(current, output_file, indent=2)
+    else:
+        json.dump(current, sys.stdout, indent=2)
+        print()
+    if options.compare:
+        with open(options.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        if compare(baseline, current, options.threshold):
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+import io
+import os
+import shutil
+import sqlite3
+import tarfile
+import time
+from .utils import get_gob_dir, ARCHIVE_DIR_NAME
+
+SEGMENT_MAX_BYTES = 1024 * 1024 * 1024
+
+def get_archive_dir():
+    return os.path.join(get_gob_dir(), ARCHIVE_DIR_NAME)
+
+def get_members_path():
+    return os.path.join(get_archive_dir(), 'members.db')
+
+def archive_enabled():
+    """Archiving solved tickets is opt-in through the GOB_ARCHIVE_SOLVED environment variable."""
+    return os.getenv('GOB_ARCHIVE_SOLVED', '').lower() in {'1', 'true', 'yes'}
+
+def get_connection():
+    """
+    Returns a connection to the member index of the solved-ticket archive.
+
+    Every archived ticket is one self-contained gzip'd tar stream appended to a segment file.
+    The index records where that stream starts and how long it is, so a single ticket can be
+    listed, extracted or tombstoned without reading the rest of the segment.
+    """
+    os.makedirs(get_archive_dir(), exist_ok=True)
+    conn = sqlite3.connect(get_members_path())
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS members (
+            ticket_id TEXT PRIMARY KEY,
+            customer TEXT,
+            segment TEXT NOT NULL,
+            offset INTEGER NOT NULL,
+            length INTEGER NOT NULL,
+            archived_at REAL NOT NULL,
+            deleted INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    return conn
+
+class _SliceReader(io.RawIOBase):
+    """Read-only view of length bytes of a file starting at offset."""
+    def __init__(self, fileobj, offset, length):
+        self.fileobj = fileobj
+        self.remaining = length
+        fileobj.seek(offset)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = min(len(buffer), self.remaining)
+        if size <= 0:
+            return 0
+        data = self.fileobj.read(size)
+        buffer[:len(data)] = data
+        self.remaining -= len(data)
+        return len(data)
+
+def _current_segment(conn):
+    row = conn.execute('SELECT segment FROM members ORDER BY rowid DESC LIMIT 1').fetchone()
+    if row:
+        path = os.path.join(get_archive_dir(), row[0])
+        if os.path.exists(path) and os.path.getsize(path) < SEGMENT_MAX_BYTES:
+            return row[0]
+        number = int(row[0].split('-')[1].split('.')[0]) + 1
+    else:
+        number = 1
+    return f'segment-{number:06d}.tgz'
+
+def archive_exists():
+    """Lookups skip the archive entirely until a ticket was archived, instead of creating an empty one."""
+    return os.path.exists(get_members_path())
+
+def list_archived_tickets():
+    if not archive_exists():
+        return []
+    conn = get_connection()
+    return [row[0] for row in conn.execute('SELECT ticket_id FROM members WHERE deleted = 0 ORDER BY ticket_id')]
+
+def is_archived(ticket_id):
+    if not archive_exists():
+        return False
+    conn = get_connection()
+    return conn.execute('SELECT 1 FROM members WHERE ticket_id = ? AND deleted = 0', (ticket_id,)).fetchone() is not None
+
+def archive_ticket(ticket_path, customer=None):
+    """
+    Appends a solved ticket directory to the current archive segment and removes the directory.
+
+    Args:
+        ticket_path (str): Path of the ticket directory in .solved.
+        customer (str, optional): Customer directory the ticket belonged to.
+    """
+    ticket_id = os.path.basename(ticket_path)
+    conn = get_connection()
+    segment = _current_segment(conn)
+    with open(os.path.join(get_archive_dir(), segment), 'ab') as segment_file:
+        offset = segment_file.tell()
+        with tarfile.open(fileobj=segment_file, mode='w|gz') as tar:
+            tar.add(ticket_path, arcname='.')
+        segment_file.flush()
+        os.fsync(segment_file.fileno())
+        length = segment_file.tell() - offset
+    with conn:
+        conn.execute('INSERT OR REPLACE INTO members (ticket_id, customer, segment, offset, length, archived_at, deleted) '
+                     'VALUES (?, ?, ?, ?, ?, ?, 0)', (ticket_id, customer, segment, offset, length, time.time()))
+    shutil.rmtree(ticket_path)
+
+def extract_ticket(ticket_id, dst):
+    """
+    Extracts one archived ticket to dst and tombstones it in the archive.
+
+    Only the ticket's own byte range is read, so the time taken depends on the ticket's
+    size and not on the size of the segment.
+
+    Returns:
+        bool: False if the ticket is not in the archive.
+    """
+    conn = get_connection()
+    row = conn.execute('SELECT segment, offset, length FROM members WHERE ticket_id = ? AND deleted = 0',
+                       (ticket_id,)).fetchone()
+    if row is None:
+        return False
+    segment, offset, length = row
+    partial = dst + '.partial'
+    if os.path.exists(partial):
+        shutil.rmtree(partial)
+    with open(os.path.join(get_archive_dir(), segment), 'rb') as segment_file:
+        reader = io.BufferedReader(_SliceReader(segment_file, offset, length))
+        with tarfile.open(fileobj=reader, mode='r|gz') as tar:
+            if hasattr(tarfile, 'data_filter'):
+                tar.extractall(partial, filter='data')
+            else:
+                tar.extractall(partial)
+    os.rename(partial, dst)
+    tombstone_ticket(ticket_id)
+    return True
+
+def tombstone_ticket(ticket_id):
+    """Marks an archived ticket as deleted without rewriting its segment."""
+    conn = get_connection()
+    with conn:
+        cursor = conn.execute('UPDATE members SET deleted = 1 WHERE ticket_id = ? AND deleted = 0', (ticket_id,))
+    return cursor.rowcount > 0
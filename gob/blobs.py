@@ -0,0 +1,195 @@
+import click
+import errno
+import fcntl
+import hashlib
+import os
+import shutil
+import stat
+import tempfile
+import time
+from .utils import get_gob_dir, BLOBS_DIR_NAME
+
+CHUNK_SIZE = 1024 * 1024
+# ioctl request number of FICLONE on Linux (btrfs, XFS, ...)
+FICLONE = 0x40049409
+# Partial copies older than this are left over from an interrupted tx mv
+INCOMING_MAX_AGE_SECONDS = 24 * 60 * 60
+
+def get_blob_dir():
+    return os.path.join(get_gob_dir(), BLOBS_DIR_NAME)
+
+def dedup_enabled():
+    """The attachment store is opt-in through the GOB_DEDUP environment variable."""
+    return os.getenv('GOB_DEDUP', '').lower() in {'1', 'true', 'yes'}
+
+def _blob_path(digest):
+    return os.path.join(get_blob_dir(), digest[:2], digest[2:])
+
+def _hash_file(path):
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as src_file:
+        for chunk in iter(lambda: src_file.read(CHUNK_SIZE), b''):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+def _copy_and_hash(path):
+    """Streams path into a temporary file in the blob store, hashing each chunk as it is copied."""
+    sha256 = hashlib.sha256()
+    fd, tmp_path = tempfile.mkstemp(dir=get_blob_dir(), prefix='.incoming-')
+    with os.fdopen(fd, 'wb') as tmp_file, open(path, 'rb') as src_file:
+        for chunk in iter(lambda: src_file.read(CHUNK_SIZE), b''):
+            sha256.update(chunk)
+            tmp_file.write(chunk)
+    return sha256.hexdigest(), tmp_path
+
+def store_file(path):
+    """
+    Moves a file into the content-addressed store.
+
+    On the same filesystem the file is hashed in place and renamed into the store, or simply
+    dropped if an identical blob already exists. From another filesystem it is copied into
+    the store while being hashed.
+
+    Returns:
+        tuple: (blob path (str), whether an identical blob was already stored (bool))
+    """
+    os.makedirs(get_blob_dir(), exist_ok=True)
+    if os.stat(path).st_dev == os.stat(get_blob_dir()).st_dev:
+        digest, incoming = _hash_file(path), path
+    else:
+        digest, incoming = _copy_and_hash(path)
+    blob_path = _blob_path(digest)
+    existed = os.path.exists(blob_path)
+    if existed:
+        os.remove(incoming)
+    else:
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        os.rename(incoming, blob_path)
+        os.chmod(blob_path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+    if incoming != path and os.path.exists(path):
+        os.remove(path)
+    return blob_path, existed
+
+def link_blob(blob_path, dst):
+    """
+    Makes dst reference a blob: a hardlink where possible, else a reflink, else a plain copy.
+
+    Returns:
+        str: 'hardlink', 'reflink' or 'copy'.
+    """
+    try:
+        os.link(blob_path, dst)
+        return 'hardlink'
+    except OSError as e:
+        if e.errno not in {errno.EXDEV, errno.EMLINK, errno.EPERM, errno.ENOTSUP}:
+            raise
+    with open(blob_path, 'rb') as src_file, open(dst, 'xb') as dst_file:
+        try:
+            fcntl.ioctl(dst_file.fileno(), FICLONE, src_file.fileno())
+            return 'reflink'
+        except OSError:
+            pass
+        try:
+            shutil.copyfileobj(src_file, dst_file, CHUNK_SIZE)
+        except BaseException:
+            os.remove(dst)
+            raise
+        return 'copy'
+
+def _restore(blob_path, existed, path, st):
+    """Puts a stored file back at path, with its original mode and times."""
+    if existed:
+        shutil.copyfile(blob_path, path)
+    else:
+        try:
+            os.rename(blob_path, path)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            shutil.copyfile(blob_path, path)
+            os.remove(blob_path)
+    os.chmod(path, stat.S_IMODE(st.st_mode))
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+def _store_and_link(path, dst):
+    """
+    Stores one file and links it at dst. If linking fails the file is put back at path, so
+    it never ends up only in the store where gob gc would delete it.
+
+    Returns:
+        bool: Whether an identical blob was already stored.
+    """
+    st = os.stat(path)
+    blob_path, existed = store_file(path)
+    try:
+        link_blob(blob_path, dst)
+    except BaseException:
+        _restore(blob_path, existed, path, st)
+        raise
+    return existed
+
+def store_path(path, ticket_path):
+    """
+    Moves a file or directory tree into a ticket, storing every regular file in the blob store.
+
+    Like shutil.move, this refuses to merge into an existing file or directory of the ticket,
+    before anything is moved. A file that cannot be linked into the ticket is put back.
+
+    Returns:
+        tuple: (files stored (int), files that were already in the store (int))
+
+    Raises:
+        FileExistsError: If the ticket already has an entry with the same name.
+    """
+    stored = duplicates = 0
+    dst = os.path.join(ticket_path, os.path.basename(os.path.normpath(path)))
+    if os.path.lexists(dst):
+        raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), dst)
+    if not os.path.isdir(path):
+        return 1, int(_store_and_link(path, dst))
+    for root, dirs, files in os.walk(path):
+        target_root = os.path.join(dst, os.path.relpath(root, path))
+        os.makedirs(target_root, exist_ok=True)
+        for name in files:
+            src = os.path.join(root, name)
+            if os.path.islink(src) or not os.path.isfile(src):
+                shutil.move(src, os.path.join(target_root, name))
+                continue
+            existed = _store_and_link(src, os.path.join(target_root, name))
+            stored += 1
+            duplicates += existed
+    shutil.rmtree(path)
+    return stored, duplicates
+
+def collect_garbage(dry_run=False):
+    """
+    Removes blobs no ticket references anymore.
+
+    Tickets reference blobs through hardlinks, so a blob whose link count dropped to one is
+    only held by the store itself. Reflinked or copied files are independent of the blob and
+    do not keep it alive.
+
+    Returns:
+        tuple: (blobs removed (int), bytes reclaimed (int))
+    """
+    removed = reclaimed = 0
+    for root, _, files in os.walk(get_blob_dir()):
+        for name in files:
+            path = os.path.join(root, name)
+            st = os.lstat(path)
+            abandoned = name.startswith('.incoming-') and time.time() - st.st_mtime > INCOMING_MAX_AGE_SECONDS
+            if abandoned or (not name.startswith('.incoming-') and st.st_nlink == 1):
+                removed += 1
+                reclaimed += st.st_size
+                if not dry_run:
+                    os.remove(path)
+    return removed, reclaimed
+
+@click.command('gc')
+@click.option('-n', '--dry-run', is_flag=True, help='Only report what would be reclaimed')
+def gc(dry_run):
+    """Reclaim attachment blobs no ticket references."""
+    click.echo("Running gob gc...")
+    removed, reclaimed = collect_garbage(dry_run=dry_run)
+    verb = 'Would reclaim' if dry_run else 'Reclaimed'
+    click.secho(f'🟢 {verb} {removed} blob(s), {reclaimed / (1024 * 1024):.1f} MiB.', fg='green')
@@ -1,75 +1,206 @@
 # cli.py
 import click
-from .cx import cx
-from .tx import tx
-from .wu import wu
+import importlib
 import os
+import sys
 import datetime
-from .utils import get_gob_dir
+import time
+from . import trace
+from .utils import get_gob_dir, get_customer_dir, INDEX_DIR_NAME, ARCHIVE_DIR_NAME, BLOBS_DIR_NAME
 
+# Subcommands living in their own modules: name -> (module, attribute, short help).
+# The short help is kept here so `gob --help` can list them without importing anything.
+LAZY_SUBCOMMANDS = {
+    'cx': ('gob.cx', 'cx', 'Manage customers.'),
+    'tx': ('gob.tx', 'tx', 'Manage tickets.'),
+    'wu': ('gob.wu', 'wu', 'Manage weekly updates.'),
+    'search': ('gob.search', 'search', 'Search ticket notes.'),
+    'gc': ('gob.blobs', 'gc', 'Reclaim attachment blobs no ticket references.'),
+    'grep': ('gob.grep', 'grep', 'Search ticket attachments.'),
+    'shell': ('gob.shell', 'shell', 'Run gob commands in a persistent session.'),
+    'watch': ('gob.watch', 'watch', 'Log workspace changes so other commands only apply the deltas.'),
+    'sync': ('gob.sync', 'sync', 'Refresh the GitHub status of linked open tickets.'),
+    'du': ('gob.du', 'du', 'Show disk usage by customer and ticket.'),
+}
 
-@click.group()
-def main():
+# Command lines that only read the workspace; `gob` forwards these to a running `gob shell --serve`
+READ_ONLY_COMMANDS = [('tree',), ('cx', 'ls'), ('tx', 'ls'), ('search',), ('grep',), ('wu', 'get')]
+DAEMON_SOCKET_NAME = 'gob.sock'
+
+class LazyGroup(click.Group):
+    """A click group that imports a subcommand's module only when that subcommand is invoked."""
+    def __init__(self, *args, lazy_subcommands=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_subcommands = lazy_subcommands or {}
+        # (module, start, end) of lazy imports, replayed as spans once tracing is turned on
+        self.import_timings = []
+
+    def list_commands(self, ctx):
+        return sorted(set(super().list_commands(ctx)) | set(self.lazy_subcommands))
+
+    def get_command(self, ctx, cmd_name):
+        if cmd_name in self.lazy_subcommands and cmd_name not in self.commands:
+            module_name, attribute, _ = self.lazy_subcommands[cmd_name]
+            start = time.perf_counter()
+            module = importlib.import_module(module_name)
+            self.import_timings.append((module_name, start, time.perf_counter()))
+            self.add_command(getattr(module, attribute), cmd_name)
+        return super().get_command(ctx, cmd_name)
+
+    def format_commands(self, ctx, formatter):
+        rows = []
+        for name in self.list_commands(ctx):
+            if name in self.lazy_subcommands and name not in self.commands:
+                rows.append((name, self.lazy_subcommands[name][2]))
+            else:
+                command = self.commands[name]
+                if not command.hidden:
+                    rows.append((name, command.get_short_help_str(formatter.width)))
+        if rows:
+            with formatter.section('Commands'):
+                formatter.write_dl(rows)
+
+
+@click.group(cls=LazyGroup, lazy_subcommands=LAZY_SUBCOMMANDS)
+@click.option('--profile', 'profile_format', type=click.Choice(['table', 'chrome']),
+              help='Time imports, filesystem walks and GitHub calls and print a summary table or write a Chrome trace '
+                   '(also $GOB_TRACE: chrome, table or any other true value for table)')
+@click.option('--trace-file', default='gob-trace.json', show_default=True, help='File written by --profile chrome')
+@click.option('--cprofile', 'cprofile_path', type=click.Path(dir_okay=False), help='Also dump cProfile stats to this file')
+@click.pass_context
+def main(ctx, profile_format, trace_file, cprofile_path):
     """Manage customers, health checks, and tickets."""
-    pass
+    profile_format = profile_format or trace_format_from_env()
+    if profile_format:
+        start_tracing(ctx, profile_format, trace_file)
+    if cprofile_path:
+        start_cprofile(ctx, cprofile_path)
+
+def trace_format_from_env():
+    """Reads $GOB_TRACE: 'chrome' or 'table' pick the format, any other true value (e.g. 1) means 'table'."""
+    value = os.getenv('GOB_TRACE', '').strip().lower()
+    if value in {'', '0', 'false', 'no', 'off'}:
+        return None
+    return value if value in {'table', 'chrome'} else 'table'
+
+def start_tracing(ctx, profile_format, trace_file):
+    trace.enable()
+    start = time.perf_counter()
+    for module_name, import_start, import_end in ctx.command.import_timings:
+        trace.add_span('import', import_start, import_end, module=module_name)
+
+    def report():
+        trace.add_span('command', start, time.perf_counter(), subcommand=ctx.invoked_subcommand)
+        if profile_format == 'chrome':
+            trace.write_chrome_trace(trace_file)
+            click.echo(f"🕵️  Trace written to {trace_file}", err=True)
+        else:
+            click.echo(trace.format_summary(), err=True)
+
+    ctx.call_on_close(report)
+
+def start_cprofile(ctx, cprofile_path):
+    import cProfile
+    profiler = cProfile.Profile()
+    profiler.enable()
 
-main.add_command(cx)
-main.add_command(tx)
-main.add_command(wu)
+    def dump():
+        profiler.disable()
+        profiler.dump_stats(cprofile_path)
+        click.echo(f"🕵️  cProfile stats written to {cprofile_path}", err=True)
+
+    ctx.call_on_close(dump)
 
 @main.command('tree')
-def list_tree():
+@click.option('-d', '--depth', type=click.IntRange(min=1), default=None, help='Maximum depth to list below ~/.gob')
+@click.option('-c', '--customer_name', required=False, help='Only list this customer')
+@click.option('-y', '--since-year', type=int, default=None, help='Oldest health-check year to list (defaults to the current year)')
+def list_tree(depth, customer_name, since_year):
     """List directories"""
-    gob_dir = get_gob_dir()
-    for root, dirs, _ in os.walk(gob_dir):
-        level = root.replace(gob_dir, '').count(os.sep)
-        if level == 0:
-            for dir_name in dirs:
-                if dir_name == 'health-check':
-                    list_health_checks(root, dir_name)
-                else:
-                    list_other_directories(root, dir_name)
-        break
-
-def list_health_checks(root, dir_name):
-    sub_dir_path = os.path.join(root, dir_name, 'premium', 'health-checks')
-    if os.path.exists(sub_dir_path):
-        current_year = str(datetime.datetime.now().year)
-        sub_level = 1
-        indent = ' ' * 4 * sub_level
-        click.echo(f"{indent}health-checks/")
-        for sub_root, sub_dirs, sub_files in os.walk(sub_dir_path):
-            if sub_root == sub_dir_path:
-                for sub_dir in sub_dirs:
-                    if sub_dir == current_year:
-                        click.echo(f"{indent}    {sub_dir}/")
-                        current_year_path = os.path.join(sub_root, sub_dir)
-                        list_markdown_files(current_year_path, indent)
-
-def list_markdown_files(current_year_path, indent):
-    for _, _, files in os.walk(current_year_path):
-        for file in files:
-            if file.endswith('.md'):
-                click.echo(f"{indent}        {file}")
-
-def list_other_directories(root, dir_name):
-    sub_dir_path = os.path.join(root, dir_name)
-    sub_level = 1
-    indent = ' ' * 4 * sub_level
-    click.echo(f"{indent}{dir_name}/")
-    for sub_root, sub_dirs, _ in os.walk(sub_dir_path):
-        if sub_root == sub_dir_path:
-            for sub_dir in sub_dirs:
-                click.echo(f"{indent}    {sub_dir}/")
-                if sub_dir == 'tickets':
-                    list_tickets(sub_root, sub_dir, indent)
-
-def list_tickets(sub_root, sub_dir, indent):
-    tickets_path = os.path.join(sub_root, sub_dir)
-    for ticket_root, ticket_dirs, _ in os.walk(tickets_path):
-        if ticket_root == tickets_path:
-            for ticket_dir in ticket_dirs:
-                click.echo(f"{indent}        {ticket_dir}/")
+    if since_year is None:
+        since_year = datetime.datetime.now().year
+    only = os.path.basename(get_customer_dir(customer_name)) if customer_name else None
+    with trace.span('cli.walk_tree'):
+        for line in walk_tree(get_gob_dir(), depth, only, since_year):
+            click.echo(line)
+
+def list_sorted(path):
+    """
+    Returns the (name, is_dir) entries of a directory sorted by name, or an empty list if it is missing.
+
+    Served from the workspace index, so only directories whose mtime changed are listed again.
+    """
+    from . import index
+    return index.list_entries(path)
+
+def walk_tree(gob_dir, depth, only, since_year):
+    """
+    Walks ~/.gob once through the workspace index and yields tree lines as they are found.
+
+    Args:
+        gob_dir (str): The gob workspace directory.
+        depth (int or None): Maximum depth to descend, None for no limit.
+        only (str or None): Directory name of the single customer to list.
+        since_year (int): Oldest health-check year to list.
+    """
+    indent = ' ' * 4
+    for name, is_dir in list_sorted(gob_dir):
+        if not is_dir or name in (INDEX_DIR_NAME, ARCHIVE_DIR_NAME, BLOBS_DIR_NAME):
+            continue
+        if only is not None and name != only:
+            continue
+        if name == 'health-check':
+            yield from walk_health_checks(os.path.join(gob_dir, name), indent, depth, since_year)
+        else:
+            yield from walk_other_directory(os.path.join(gob_dir, name), indent, depth)
+
+def walk_health_checks(health_check_path, indent, depth, since_year):
+    health_checks_path = os.path.join(health_check_path, 'premium', 'health-checks')
+    if not os.path.isdir(health_checks_path):
+        return
+    yield f"{indent}health-checks/"
+    if depth is not None and depth < 2:
+        return
+    for year, is_dir in list_sorted(health_checks_path):
+        if is_dir and year.isdigit() and int(year) >= since_year:
+            yield f"{indent}    {year}/"
+            yield from walk_markdown_files(os.path.join(health_checks_path, year), indent, depth, 3)
+
+def walk_markdown_files(path, indent, depth, level):
+    if depth is not None and depth < level:
+        return
+    for name, is_dir in list_sorted(path):
+        if is_dir:
+            yield from walk_markdown_files(os.path.join(path, name), indent, depth, level + 1)
+        elif name.endswith('.md'):
+            yield f"{indent}        {name}"
+
+def walk_other_directory(path, indent, depth):
+    yield f"{indent}{os.path.basename(path)}/"
+    if depth is not None and depth < 2:
+        return
+    for sub_dir, is_dir in list_sorted(path):
+        if not is_dir:
+            continue
+        yield f"{indent}    {sub_dir}/"
+        if sub_dir == 'tickets' and (depth is None or depth >= 3):
+            for ticket, is_ticket_dir in list_sorted(os.path.join(path, sub_dir)):
+                if is_ticket_dir:
+                    yield f"{indent}        {ticket}/"
+
+def get_socket_path():
+    return os.path.join(get_gob_dir(), INDEX_DIR_NAME, DAEMON_SOCKET_NAME)
+
+def run():
+    """Entry point of the gob script: lets a running daemon answer read-only commands, else runs main."""
+    args = sys.argv[1:]
+    if os.path.exists(get_socket_path()) and not trace_format_from_env():
+        from .shell import forward, is_read_only
+        if is_read_only(args):
+            exit_code = forward(get_socket_path(), args)
+            if exit_code is not None:
+                sys.exit(exit_code)
+    main()
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    run()
\ No newline at end of file
@@ -1,6 +1,7 @@
 # cx.py
 import click
-from .utils import get_customer_dir, create_directory, remove_directory, list_directories, open_directory, get_gob_dir
+from .utils import get_customer_dir, create_directory, remove_directory, open_directory, get_gob_dir
+from . import index
 import os
 
 @click.group()
@@ -15,6 +16,7 @@ def create_customer(customer_name):
     click.echo("Running gob cx add...")
     customer_dir = get_customer_dir(customer_name)
     if create_directory(customer_dir):
+        index.refresh(get_gob_dir())
         click.secho(f'🟢 Customer directory {customer_name} created.', fg='green')
     else:
         click.secho(f'🔴 Customer directory {customer_name} already exists.', fg='red')
@@ -23,6 +25,7 @@ def create_customer(customer_name):
 @click.option('-c', '--customer_name', required=True, help='Name of the customer')
 def remove_customer(customer_name):
     """Remove a customer directory."""
+    from . import du
     click.echo("Running gob cx rm...")
     customer_dir = get_customer_dir(customer_name)
     if not os.path.exists(customer_dir):
@@ -31,8 +34,12 @@ def remove_customer(customer_name):
     click.echo(f'Contents of {customer_name} directory:')
     for item in os.listdir(customer_dir):
         click.echo(item)
+    click.echo(du.describe_reclaimable([customer_dir]))
     if click.confirm('Are you sure you want to delete this directory?', default=False):
         if remove_directory(customer_dir):
+            index.forget(customer_dir)
+            index.forget_customer_tickets(os.path.basename(customer_dir))
+            index.refresh(get_gob_dir())
             click.secho(f'🟢 Customer directory {customer_name} has been removed.', fg='green')
         else:
             click.secho(f'🔴 Error: Failed to remove customer directory {customer_name}.', fg='red')
@@ -41,16 +48,15 @@ def remove_customer(customer_name):
 
 @cx.command('ls')
 def list_customers():
-    """List all customer directories except the .solved directory."""
+    """List all customer directories except the .solved and .index directories."""
     click.echo("Running gob cx ls...")
-    customers = list_directories(get_gob_dir())
+    customers = [d for d in index.list_directories(get_gob_dir()) if not d.startswith('.')]
     if not customers:
         click.secho('🔴 No customer directories found.', fg='red')
     else:
         click.secho('🟢 Customers:', fg='green')
         for customer in customers:
-            if customer != '.solved':
-                click.echo(f'\t{customer}')
+            click.echo(f'\t{customer}')
 
 @cx.command('open')
 @click.option('-c', '--customer_name', required=True, help='Name of the customer')
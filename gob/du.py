@@ -0,0 +1,168 @@
+import click
+import os
+from .utils import get_gob_dir, get_customer_dir
+from . import index
+from . import trace
+from . import watch
+
+def format_size(size):
+    if size < 1024:
+        return f'{size} B'
+    for unit in ('KiB', 'MiB', 'GiB', 'TiB'):
+        size /= 1024
+        if size < 1024 or unit == 'TiB':
+            return f'{size:.1f} {unit}'
+
+class SizeCache:
+    """
+    Disk usage of directories, cached in the index by path and mtime.
+
+    Each directory stores the size of the files directly inside it. A directory whose mtime
+    did not change is not listed again and its files are not stat'ed; only its subdirectories
+    are visited. While `gob watch` runs, directories with files changed in place are measured
+    again as well. Files with more than one link (attachments shared through the blob store)
+    are counted separately as linked size, since removing one ticket does not free them.
+    Rows are looked up as directories are visited, so sizing one ticket reads only its own.
+
+    Args:
+        refresh (bool): Ignore the cache and stat every file.
+        preload (bool): Read all rows in one query instead, for sizing the whole workspace.
+    """
+    def __init__(self, refresh=False, preload=False):
+        self.conn = index.get_connection()
+        self.refresh = refresh
+        self.rows = None
+        if preload and not refresh:
+            self.rows = {path: (mtime_ns, own_size, linked_size) for path, mtime_ns, own_size, linked_size in
+                         self.conn.execute('SELECT path, mtime_ns, own_size, linked_size FROM sizes')}
+        self.totals = {}
+        self.updates = []
+        self.seq = watch.current_seq()
+        self.stale = self.changed_dirs()
+
+    def changed_dirs(self):
+        """Directories the `gob watch` change log saw files change in since the last run."""
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'du_seq'").fetchone()
+        changes = watch.changes_since(row[0] if row else None)
+        gob_dir = get_gob_dir()
+        return {os.path.dirname(os.path.join(gob_dir, change['path'])) for change in changes or []}
+
+    def cached(self, path):
+        """Returns the cached (mtime_ns, own_size, linked_size) of one directory, or None."""
+        if self.refresh:
+            return None
+        if self.rows is not None:
+            return self.rows.get(path)
+        return self.conn.execute('SELECT mtime_ns, own_size, linked_size FROM sizes WHERE path = ?', (path,)).fetchone()
+
+    @staticmethod
+    def measure_files(path):
+        own_size = linked_size = 0
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    continue
+                st = entry.stat(follow_symlinks=False)
+                if st.st_nlink > 1:
+                    linked_size += st.st_blocks * 512
+                else:
+                    own_size += st.st_blocks * 512
+        return own_size, linked_size
+
+    def size(self, path):
+        """
+        Returns the disk usage of the tree below path.
+
+        Returns:
+            tuple: (own size (int), linked size (int)) in bytes.
+        """
+        path = os.path.abspath(path)
+        if path in self.totals:
+            return self.totals[path]
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return 0, 0
+        cached = self.cached(path)
+        if cached and cached[0] == mtime_ns and path not in self.stale:
+            own_size, linked_size = cached[1], cached[2]
+        else:
+            with trace.span('du.measure', path=path):
+                own_size, linked_size = self.measure_files(path)
+            self.updates.append((path, mtime_ns, own_size, linked_size))
+            self.stale.discard(path)
+        for name in index.list_directories(path):
+            sub_own, sub_linked = self.size(os.path.join(path, name))
+            own_size += sub_own
+            linked_size += sub_linked
+        self.totals[path] = (own_size, linked_size)
+        return own_size, linked_size
+
+    def save(self):
+        with self.conn:
+            # Changed directories this run did not get to are measured again next time
+            self.conn.executemany('DELETE FROM sizes WHERE path = ?', [(path,) for path in self.stale])
+            self.conn.executemany('INSERT OR REPLACE INTO sizes (path, mtime_ns, own_size, linked_size) VALUES (?, ?, ?, ?)',
+                                  self.updates)
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('du_seq', ?)", (self.seq,))
+        self.updates = []
+
+def reclaimable(paths):
+    """
+    Returns how much disk removing paths would free.
+
+    Returns:
+        tuple: (bytes freed right away (int), bytes of shared attachments freed by gob gc at most (int))
+    """
+    cache = SizeCache()
+    sizes = [cache.size(path) for path in paths]
+    cache.save()
+    return sum(own for own, _ in sizes), sum(linked for _, linked in sizes)
+
+def describe_reclaimable(paths):
+    own_size, linked_size = reclaimable(paths)
+    message = f'💾 Removing frees {format_size(own_size)}'
+    if linked_size:
+        message += f', plus up to {format_size(linked_size)} of shared attachments once gob gc runs'
+    return message + '.'
+
+def top_sizes(cache, paths, top):
+    """Returns the top (total size, label) pairs for a list of (path, label) tuples, largest first."""
+    sizes = [(sum(cache.size(path)), label) for path, label in paths]
+    return sorted(sizes, key=lambda size: size[0], reverse=True)[:top]
+
+def echo_sizes(title, sizes):
+    click.secho(title, fg='green')
+    for size, label in sizes:
+        click.echo(f'  {format_size(size):>10}  {label}')
+
+@click.command('du')
+@click.option('-c', '--customer_name', required=False, help='Only report this customer')
+@click.option('-n', '--top', type=click.IntRange(min=1), default=10, show_default=True, help='Entries per section')
+@click.option('-r', '--refresh', is_flag=True,
+              help='Stat every file again, e.g. after attachments were edited in place while gob watch was not running')
+def du(customer_name, top, refresh):
+    """Show disk usage by customer and ticket."""
+    click.echo("Running gob du...")
+    gob_dir = get_gob_dir()
+    if customer_name:
+        customers = [os.path.basename(get_customer_dir(customer_name))]
+        if not os.path.isdir(os.path.join(gob_dir, customers[0])):
+            click.secho(f'🔴 Error: Customer directory {customer_name} does not exist.', fg='red')
+            return
+    else:
+        customers = [name for name in index.list_directories(gob_dir) if not name.startswith('.')]
+    cache = SizeCache(refresh=refresh, preload=True)
+    tickets = []
+    for customer in customers:
+        tickets_dir = os.path.join(gob_dir, customer, 'tickets')
+        tickets.extend((os.path.join(tickets_dir, ticket_id), f'{customer}/{ticket_id}')
+                       for ticket_id in index.list_directories(tickets_dir))
+    echo_sizes('🟢 Tickets:', top_sizes(cache, tickets, top))
+    customer_sizes = top_sizes(cache, [(os.path.join(gob_dir, customer), customer) for customer in customers], top)
+    echo_sizes('🟢 Customers:', customer_sizes)
+    if not customer_name:
+        solved_dir = os.path.join(gob_dir, '.solved')
+        solved = [(os.path.join(solved_dir, ticket_id), ticket_id) for ticket_id in index.list_directories(solved_dir)]
+        echo_sizes(f'🟢 Solved tickets ({format_size(sum(cache.size(solved_dir)))} in .solved):', top_sizes(cache, solved, top))
+    cache.save()
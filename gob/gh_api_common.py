@@ -1,6 +1,30 @@
+import hashlib
+import json
 import os
-import requests
+import random
+import re
+import threading
+import time
+from urllib.parse import urlparse, parse_qs
+from .utils import get_gob_dir
+from . import trace
 
+ISSUE_URL_PATTERN = re.compile(r'^https?://[^/]+/(?P<owner>[^/]+)/(?P<repository>[^/]+)/(?:issues|pull)/(?P<number>\d+)/?$')
+HTTP_CACHE_MAX_BYTES = 50 * 1024 * 1024
+ISSUES_PER_PAGE = 100
+PAGE_WORKERS = 4
+HTTP_POOL_SIZE = 16
+MAX_RETRIES = 5
+BACKOFF_BASE_SECONDS = 1
+BACKOFF_MAX_SECONDS = 60
+# Start spreading requests over the rest of the rate-limit window below this many remaining calls
+PACING_THRESHOLD = 50
+# Longest gap pacing puts between two requests, so an interactive command never stalls for minutes
+MAX_PACING_SECONDS = 5
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+@trace.traced('github.token')
 def build_headers():
     github_token = os.getenv('GITHUB_TOKEN')
     if not github_token:
@@ -23,7 +47,9 @@ def handle_response(response):
         tuple: (request_successful (bool), response_data (dict or list), error_message (str or None))
     """
     if response.ok:  # Checks for 200-299 status codes
-        return True, response.json(), None
+        with trace.span('json.decode', bytes=len(response.content)):
+            data = response.json()
+        return True, data, None
     elif response.status_code in {400, 401, 403, 404}:
         # Handle client-side errors (invalid input, authentication issues, etc.)
         error_message = f"Client error ({response.status_code}): {response.text}"
@@ -44,33 +70,376 @@ class HoustonError(Exception):
         self.message = f"🧑‍🚀 Houston, we have a problem: {message}"
         super().__init__(self.message)
 
+def api_base_url():
+    return os.getenv('GITHUB_API_URL', 'https://api.github.com').rstrip('/')
+
 def issues_list_url(owner, repository):
-    return f"https://api.github.com/repos/{owner}/{repository}/issues"
+    return f"{api_base_url()}/repos/{owner}/{repository}/issues"
+
+def issue_api_url(issue_url):
+    """
+    Maps a GitHub issue or pull request URL (https://github.com/OWNER/REPO/issues/N) to its API URL.
+
+    Returns:
+        str or None: The API URL, or None if issue_url is not an issue URL.
+    """
+    match = ISSUE_URL_PATTERN.match(issue_url)
+    if not match:
+        return None
+    return f"{api_base_url()}/repos/{match['owner']}/{match['repository']}/issues/{match['number']}"
+
+def is_rate_limited(response):
+    if response.status_code not in {403, 429}:
+        return False
+    return response.headers.get('X-RateLimit-Remaining') == '0' or 'Retry-After' in response.headers
 
-def list_issues(owner, repository, params=None):
+class RequestScheduler:
     """
-    Fetches the list of issues from the specified repository.
+    Paces and retries GitHub API requests based on the rate-limit headers of earlier responses.
+
+    Requests wait for the reset once the rate limit is exhausted, and are spread evenly over
+    the remaining window when only a few calls are left: each request reserves the next send
+    slot under the lock, so concurrent callers go out one interval apart instead of in a
+    burst, and no interval exceeds MAX_PACING_SECONDS. Rate-limited responses are retried
+    for every method since GitHub did not process them. 5xx responses and connection errors
+    are retried only for idempotent methods, with jittered exponential backoff unless the
+    server sent Retry-After. The total time spent waiting is kept in `waited`.
 
     Args:
-        owner (str): The owner of the repository.
-        repository (str): The name of the repository.
-        params (dict, optional): Additional query parameters for the API request.
+        max_retries (int): Retries per request before giving up.
+        sleep (callable): Sleep function, replaceable for tests.
+        clock (callable): Returns the current epoch time in seconds.
+    """
+    def __init__(self, max_retries=MAX_RETRIES, sleep=time.sleep, clock=time.time):
+        self.max_retries = max_retries
+        self.sleep = sleep
+        self.clock = clock
+        self.remaining = None
+        self.reset_at = None
+        self.next_send_at = 0.0
+        self.waited = 0.0
+        self.lock = threading.Lock()
 
-    Returns:
+    def wait(self, seconds):
+        if seconds > 0:
+            self.sleep(seconds)
+            with self.lock:
+                self.waited += seconds
+
+    def pace(self):
+        """
+        Sleeps before a request when the rate-limit window is nearly used up.
+
+        Returns:
+            bool: Whether the request took one of the remaining calls.
+        """
+        with self.lock:
+            remaining, reset_at = self.remaining, self.reset_at
+            reserved = remaining is not None and remaining > 0
+            if reserved:
+                self.remaining -= 1
+            delay = 0
+            now = self.clock()
+            if remaining is not None and reset_at is not None and reset_at > now:
+                if remaining <= 0:
+                    delay = reset_at - now
+                elif remaining < PACING_THRESHOLD:
+                    send_at = max(now, self.next_send_at)
+                    self.next_send_at = send_at + min((reset_at - now) / remaining, MAX_PACING_SECONDS)
+                    delay = send_at - now
+        self.wait(delay)
+        return reserved
+
+    def record(self, response, reserved=False):
+        remaining = response.headers.get('X-RateLimit-Remaining')
+        reset_at = response.headers.get('X-RateLimit-Reset')
+        with self.lock:
+            if remaining is not None:
+                self.remaining = int(remaining)
+            elif reserved and response.status_code == 304 and self.remaining is not None:
+                # Conditional requests answered with 304 do not count against the rate limit
+                self.remaining += 1
+            if reset_at is not None:
+                self.reset_at = int(reset_at)
+
+    def backoff(self, attempt, response=None):
+        """Returns how long to wait before retry number attempt (starting at 0)."""
+        if response is not None:
+            retry_after = response.headers.get('Retry-After')
+            if retry_after is not None and retry_after.isdigit():
+                return int(retry_after)
+            if response.headers.get('X-RateLimit-Remaining') == '0' and self.reset_at is not None:
+                return max(0, self.reset_at - self.clock())
+        return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+    def send(self, session, method, url, **kwargs):
+        """
+        Sends a request through the session, pacing it and retrying it when it is safe to.
+
+        Returns:
+            requests.Response: The last response received.
+        """
+        import requests
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        attempt = 0
+        while True:
+            reserved = self.pace()
+            try:
+                response = session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if not idempotent or attempt >= self.max_retries:
+                    raise
+                self.wait(self.backoff(attempt))
+                attempt += 1
+                continue
+            self.record(response, reserved)
+            retryable = is_rate_limited(response) or (idempotent and response.status_code in RETRYABLE_STATUS_CODES)
+            if not retryable or attempt >= self.max_retries:
+                return response
+            self.wait(self.backoff(attempt, response))
+            attempt += 1
+
+def get_http_cache_dir():
+    return os.path.join(get_gob_dir(), '.index', 'http-cache')
+
+class HttpCache:
+    """
+    On-disk cache of GitHub GET responses keyed by URL and query parameters.
+
+    Each entry stores the ETag/Last-Modified validators together with the decoded body so a
+    304 Not Modified can be answered locally. The oldest entries are evicted once the cache
+    grows past max_bytes.
+    """
+    def __init__(self, cache_dir, max_bytes=HTTP_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        # Running estimate of the cache size, so a burst of puts does not rescan the directory each time
+        self.size = None
+        self.lock = threading.Lock()
+
+    def _entry_path(self, url, params):
+        key = json.dumps([url, sorted((params or {}).items())], default=str)
+        return os.path.join(self.cache_dir, hashlib.sha256(key.encode()).hexdigest() + '.json')
+
+    def get(self, url, params):
+        try:
+            with open(self._entry_path(url, params)) as entry_file:
+                return json.load(entry_file)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def put(self, url, params, response, data):
+        validators = {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+        }
+        if not any(validators.values()):
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        entry_path = self._entry_path(url, params)
+        tmp_path = entry_path + '.tmp'
+        with open(tmp_path, 'w') as entry_file:
+            json.dump(dict(validators, data=data, links=response.links), entry_file)
+        os.replace(tmp_path, entry_path)
+        with self.lock:
+            if self.size is None:
+                self.size = self.evict()
+            else:
+                self.size += os.path.getsize(entry_path)
+                if self.size > self.max_bytes:
+                    self.size = self.evict()
+
+    def touch(self, url, params):
+        try:
+            os.utime(self._entry_path(url, params))
+        except FileNotFoundError:
+            pass
+
+    def evict(self):
+        """Removes least recently used entries until the cache fits in max_bytes and returns its size."""
+        entries = []
+        total = 0
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith('.json'):
+                    st = entry.stat()
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+                    total += st.st_size
+        entries.sort()
+        while total > self.max_bytes and entries:
+            _, size, path = entries.pop(0)
+            os.remove(path)
+            total -= size
+        return total
+
+class GitHubClient:
+    """
+    Reusable GitHub API client holding a pooled requests.Session and an optional HTTP cache.
+
+    Args:
+        use_cache (bool): Send conditional requests for GETs and answer 304s from the on-disk cache.
+            Can also be turned off with the GOB_NO_HTTP_CACHE environment variable.
+    """
+    def __init__(self, use_cache=True):
+        import requests
+        self.session = requests.Session()
+        # Enough pooled connections for the concurrent page fetches and gob sync
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=HTTP_POOL_SIZE)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update(build_headers())
+        self.scheduler = RequestScheduler()
+        if trace.is_enabled():
+            trace.install_network_hooks()
+        use_cache = use_cache and not os.getenv('GOB_NO_HTTP_CACHE')
+        self.cache = HttpCache(get_http_cache_dir()) if use_cache else None
+
+    def get(self, url, params=None, use_cache=True):
+        """
+        Performs a GET request, revalidating any cached copy with If-None-Match/If-Modified-Since.
+
+        Returns:
+            tuple: (request_successful (bool), response_data (list or dict), error_message (str or None))
+        """
+        success, data, error, _ = self.get_page(url, params=params, use_cache=use_cache)
+        return success, data, error
+
+    def get_page(self, url, params=None, use_cache=True):
+        """
+        Same as get, but also returns the parsed Link header used for pagination.
+
+        Returns:
+            tuple: (request_successful (bool), response_data (list or dict), error_message (str or None), links (dict))
+        """
+        params = params or {}
+        cache = self.cache if use_cache else None
+        cached = cache.get(url, params) if cache else None
+        headers = {}
+        if cached:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+        import requests
+        try:
+            with trace.span('http.GET', url=url) as span_args:
+                response = self.scheduler.send(self.session, 'GET', url, headers=headers, params=params)
+                span_args.update(status=response.status_code, ttfb_ms=round(response.elapsed.total_seconds() * 1000, 1))
+        except requests.RequestException as e:
+            return False, {}, f"Request failed: {e}", {}
+        if response.status_code == 304 and cached:
+            cache.touch(url, params)
+            return True, cached['data'], None, cached.get('links', {})
+        success, data, error = handle_response(response)
+        if success and cache:
+            cache.put(url, params, response, data)
+        return success, data, error, response.links
+
+    def post(self, url, json_data):
+        import requests
+        try:
+            with trace.span('http.POST', url=url) as span_args:
+                response = self.scheduler.send(self.session, 'POST', url, json=json_data)
+                span_args.update(status=response.status_code, ttfb_ms=round(response.elapsed.total_seconds() * 1000, 1))
+        except requests.RequestException as e:
+            return False, {}, f"Request failed: {e}"
+        return handle_response(response)
+
+_client = None
+
+def get_client():
+    """Returns the process-wide GitHubClient, creating it on first use."""
+    global _client
+    if _client is None:
+        _client = GitHubClient()
+    return _client
+
+def _page_number(link):
+    return int(parse_qs(urlparse(link['url']).query).get('page', ['0'])[0])
+
+def iter_issue_pages(owner, repository, params=None, use_cache=True, max_workers=PAGE_WORKERS):
+    """
+    Yields the pages of an issues listing in order, following the Link header.
+
+    When the first page reports the last page number, the remaining pages are fetched
+    concurrently by at most max_workers threads, a window at a time, so a consumer that
+    stops early does not pay for pages it never reads.
+
+    Yields:
         tuple: (request_successful (bool), response_data (list or dict), error_message (str or None))
     """
+    from collections import deque
+    from concurrent.futures import ThreadPoolExecutor
+    client = get_client()
     url = issues_list_url(owner, repository)
-    headers = build_headers()
+    params = dict(params or {})
+    params.setdefault('per_page', ISSUES_PER_PAGE)
+    success, data, error, links = client.get_page(url, params=params, use_cache=use_cache)
+    yield success, data, error
+    if not success:
+        return
+    if 'last' in links:
+        last_page = _page_number(links['last'])
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = deque()
+            pages = iter(range(2, last_page + 1))
+            try:
+                for page in pages:
+                    pending.append(executor.submit(client.get, url, dict(params, page=page), use_cache))
+                    if len(pending) >= max_workers:
+                        break
+                while pending:
+                    result = pending.popleft().result()
+                    yield result
+                    if not result[0]:
+                        return
+                    page = next(pages, None)
+                    if page is not None:
+                        pending.append(executor.submit(client.get, url, dict(params, page=page), use_cache))
+            finally:
+                for future in pending:
+                    future.cancel()
+    else:
+        while 'next' in links:
+            success, data, error, links = client.get_page(links['next']['url'], use_cache=use_cache)
+            yield success, data, error
+            if not success:
+                return
 
-    # Ensure params is a dictionary, even if None is passed
-    params = params or {}
+def iter_issues(owner, repository, params=None, use_cache=True):
+    """
+    Yields the issues of a repository one at a time across all pages.
+
+    Raises:
+        HoustonError: If any page could not be fetched.
+    """
+    for success, issues, error in iter_issue_pages(owner, repository, params=params, use_cache=use_cache):
+        if not success:
+            raise HoustonError(error)
+        yield from issues
 
-    # Perform the GET request
-    response = requests.get(url, headers=headers, params=params)
+@trace.traced('github.list_issues')
+def list_issues(owner, repository, params=None, use_cache=True):
+    """
+    Fetches the full list of issues from the specified repository, across all pages.
 
-    # Handle the response based on its status code
-    return handle_response(response)
+    Args:
+        owner (str): The owner of the repository.
+        repository (str): The name of the repository.
+        params (dict, optional): Additional query parameters for the API request.
+        use_cache (bool, optional): Set to False to bypass the HTTP cache.
 
+    Returns:
+        tuple: (request_successful (bool), response_data (list or dict), error_message (str or None))
+    """
+    issues = []
+    for success, data, error in iter_issue_pages(owner, repository, params=params, use_cache=use_cache):
+        if not success:
+            return False, data, error
+        issues.extend(data)
+    return True, issues, None
+
+@trace.traced('github.post_issue_comment')
 def post_issue_comment(comment_url, comment_data):
     """
     Posts a comment to a specified issue.
@@ -82,10 +451,4 @@ def post_issue_comment(comment_url, comment_data):
     Returns:
         tuple: (request_successful (bool), response_data (dict), error_message (str or None))
     """
-    headers = build_headers()
-
-    # Perform the POST request
-    response = requests.post(comment_url, headers=headers, json=comment_data)
-
-    return handle_response(response)
-
+    return get_client().post(comment_url, comment_data)
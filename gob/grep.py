@@ -0,0 +1,166 @@
+import click
+import gzip
+import mmap
+import os
+import re
+from collections import deque
+from .utils import get_gob_dir, get_customer_dir
+from . import index
+
+BINARY_SNIFF_BYTES = 8192
+
+def iter_ticket_files(customer=None, solved=False):
+    """
+    Yields every file below the ticket directories, grouped and ordered by ticket.
+
+    Yields:
+        tuple: (owner (str), ticket_id (str), path (str))
+    """
+    gob_dir = get_gob_dir()
+    customers = [customer] if customer else [c for c in index.list_directories(gob_dir) if not c.startswith('.')]
+    ticket_dirs = []
+    for name in customers:
+        tickets_dir = os.path.join(gob_dir, name, 'tickets')
+        ticket_dirs.extend((name, ticket_id, os.path.join(tickets_dir, ticket_id))
+                           for ticket_id in index.list_directories(tickets_dir))
+    if solved:
+        solved_dir = os.path.join(gob_dir, '.solved')
+        ticket_dirs.extend(('.solved', ticket_id, os.path.join(solved_dir, ticket_id))
+                           for ticket_id in index.list_directories(solved_dir))
+    for owner, ticket_id, ticket_path in ticket_dirs:
+        for root, dirs, files in os.walk(ticket_path):
+            dirs.sort()
+            for name in sorted(files):
+                yield owner, ticket_id, os.path.join(root, name)
+
+def is_binary(sample):
+    return b'\0' in sample
+
+def _scan_lines(lines, regex, max_count):
+    matches = []
+    for line_number, line in enumerate(lines, 1):
+        if regex.search(line):
+            matches.append((line_number, line.rstrip(b'\r\n').decode('utf-8', errors='replace')))
+            if max_count and len(matches) >= max_count:
+                break
+    return matches
+
+def _scan_mmap(mm, regex, max_count):
+    matches = []
+    line_number = 1
+    counted_to = 0
+    position = 0
+    while True:
+        match = regex.search(mm, position)
+        if match is None or (match.start() == len(mm) and mm[-1:] == b'\n'):
+            break
+        line_start = mm.rfind(b'\n', 0, match.start()) + 1
+        line_end = mm.find(b'\n', match.end())
+        if line_end == -1:
+            line_end = len(mm)
+        line_number += mm[counted_to:line_start].count(b'\n')
+        counted_to = line_start
+        matches.append((line_number, mm[line_start:line_end].rstrip(b'\r').decode('utf-8', errors='replace')))
+        if max_count and len(matches) >= max_count:
+            break
+        position = line_end + 1
+        if position > len(mm):
+            break
+    return matches
+
+def scan_file(path, pattern, ignore_case, max_count):
+    """
+    Returns (line number, line) matches of pattern in one file, skipping binary files.
+
+    Plain files are scanned through mmap; .gz files are decompressed as a stream. Runs in a
+    worker process, so it only takes picklable arguments.
+    """
+    regex = re.compile(pattern, re.MULTILINE | (re.IGNORECASE if ignore_case else 0))
+    try:
+        if path.endswith('.gz'):
+            with gzip.open(path, 'rb') as gz_file:
+                if is_binary(gz_file.peek(BINARY_SNIFF_BYTES)[:BINARY_SNIFF_BYTES]):
+                    return []
+                return _scan_lines(gz_file, regex, max_count)
+        with open(path, 'rb') as plain_file:
+            if is_binary(plain_file.read(BINARY_SNIFF_BYTES)):
+                return []
+            if os.fstat(plain_file.fileno()).st_size == 0:
+                return []
+            with mmap.mmap(plain_file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return _scan_mmap(mm, regex, max_count)
+    except (OSError, EOFError, gzip.BadGzipFile):
+        return []
+
+def grep_files(files, pattern, ignore_case=False, max_count=None, jobs=None):
+    """
+    Scans files across a process pool and yields their matches in the order of files.
+
+    At most a few files per worker are in flight, so once max_count matches were found the
+    remaining files are never scanned.
+
+    Yields:
+        tuple: (file entry, list of (line number, line)) for files with at least one match.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    jobs = jobs or os.cpu_count() or 1
+    found = 0
+    files = iter(files)
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        pending = deque()
+
+        def submit():
+            entry = next(files, None)
+            if entry is not None:
+                remaining = max_count - found if max_count else None
+                pending.append((entry, executor.submit(scan_file, entry[-1], pattern, ignore_case, remaining)))
+
+        for _ in range(jobs * 4):
+            submit()
+        try:
+            while pending:
+                entry, future = pending.popleft()
+                matches = future.result()
+                if matches:
+                    if max_count:
+                        matches = matches[:max_count - found]
+                    found += len(matches)
+                    yield entry, matches
+                    if max_count and found >= max_count:
+                        return
+                submit()
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+@click.command('grep')
+@click.option('-c', '--customer_name', required=False, help='Only search tickets of this customer')
+@click.option('-s', '--solved', is_flag=True, help='Also search solved tickets')
+@click.option('-i', '--ignore-case', is_flag=True, help='Case-insensitive match')
+@click.option('-F', '--fixed-strings', is_flag=True, help='Treat PATTERN as a literal string')
+@click.option('-m', '--max-count', type=click.IntRange(min=1), default=None, help='Stop after this many matching lines')
+@click.option('-j', '--jobs', type=click.IntRange(min=1), default=None, help='Worker processes (defaults to the CPU count)')
+@click.argument('pattern')
+def grep(customer_name, solved, ignore_case, fixed_strings, max_count, jobs, pattern):
+    """Search ticket attachments, including .gz logs."""
+    click.echo("Running gob grep...")
+    customer = os.path.basename(get_customer_dir(customer_name)) if customer_name else None
+    regex = re.escape(pattern) if fixed_strings else pattern
+    try:
+        re.compile(regex)
+    except re.error as e:
+        click.secho(f'🔴 Error: Invalid pattern: {e}', fg='red')
+        return
+    current_ticket = None
+    any_match = False
+    files = iter_ticket_files(customer, solved)
+    for (owner, ticket_id, path), matches in grep_files(files, regex.encode(), ignore_case, max_count, jobs):
+        any_match = True
+        if (owner, ticket_id) != current_ticket:
+            current_ticket = (owner, ticket_id)
+            click.secho(f'🎫 {owner}/{ticket_id}', fg='green')
+        relative_path = os.path.relpath(path, os.path.join(get_gob_dir(), owner, '' if owner == '.solved' else 'tickets', ticket_id))
+        for line_number, line in matches:
+            click.echo(f'  {relative_path}:{line_number}: {line}')
+    if not any_match:
+        click.secho(f'🔴 No matches found for "{pattern}".', fg='red')
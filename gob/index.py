@@ -0,0 +1,335 @@
+import json
+import os
+import sqlite3
+from .utils import get_gob_dir, INDEX_DIR_NAME
+from . import trace
+
+_connection = None
+# path -> (mtime_ns, entries); spares the SQLite round trip when one process lists a directory repeatedly
+_listings = {}
+
+def get_index_dir():
+    return os.path.join(get_gob_dir(), INDEX_DIR_NAME)
+
+def get_connection():
+    """
+    Returns the shared connection to the workspace index, creating the schema on first use.
+
+    The index lives in ~/.gob/.index/index.db and caches one listing per directory,
+    keyed by the directory's mtime so changes made outside gob are picked up.
+    """
+    global _connection
+    if _connection is None:
+        os.makedirs(get_index_dir(), exist_ok=True)
+        _connection = sqlite3.connect(os.path.join(get_index_dir(), 'index.db'))
+        _connection.executescript("""
+            CREATE TABLE IF NOT EXISTS dirs (
+                path TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS entries (
+                parent TEXT NOT NULL,
+                name TEXT NOT NULL,
+                is_dir INTEGER NOT NULL,
+                PRIMARY KEY (parent, name)
+            );
+            CREATE TABLE IF NOT EXISTS tickets (
+                ticket_id TEXT PRIMARY KEY,
+                customer TEXT,
+                state TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS sizes (
+                path TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL,
+                own_size INTEGER NOT NULL,
+                linked_size INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS ticket_scans (
+                path TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS links (
+                ticket_id TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                issue_state TEXT,
+                labels TEXT,
+                comments INTEGER,
+                last_comment_at TEXT,
+                synced_at TEXT
+            );
+        """)
+    return _connection
+
+@trace.traced('index.rescan')
+def _scan(conn, path, mtime_ns):
+    with os.scandir(path) as it:
+        entries = sorted((path, entry.name, int(entry.is_dir())) for entry in it)
+    with conn:
+        conn.execute('DELETE FROM entries WHERE parent = ?', (path,))
+        conn.executemany('INSERT INTO entries (parent, name, is_dir) VALUES (?, ?, ?)', entries)
+        conn.execute('INSERT OR REPLACE INTO dirs (path, mtime_ns) VALUES (?, ?)', (path, mtime_ns))
+    listing = [(name, bool(is_dir)) for _, name, is_dir in entries]
+    _listings[path] = (mtime_ns, listing)
+    return listing
+
+@trace.traced('index.list_entries')
+def list_entries(path):
+    """
+    Lists the entries of a directory from the index, rescanning it only if its mtime changed.
+
+    Args:
+        path (str): The directory to list.
+
+    Returns:
+        list: (name (str), is_dir (bool)) tuples, or an empty list if the directory does not exist.
+    """
+    path = os.path.abspath(path)
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        forget(path)
+        return []
+    cached = _listings.get(path)
+    if cached is not None and cached[0] == mtime_ns:
+        return list(cached[1])
+    conn = get_connection()
+    row = conn.execute('SELECT mtime_ns FROM dirs WHERE path = ?', (path,)).fetchone()
+    if row is None or row[0] != mtime_ns:
+        return _scan(conn, path, mtime_ns)
+    rows = conn.execute('SELECT name, is_dir FROM entries WHERE parent = ? ORDER BY name', (path,))
+    listing = [(name, bool(is_dir)) for name, is_dir in rows]
+    _listings[path] = (mtime_ns, listing)
+    return list(listing)
+
+def list_directories(path):
+    return [name for name, is_dir in list_entries(path) if is_dir]
+
+def list_files(path):
+    return [name for name, is_dir in list_entries(path) if not is_dir]
+
+def refresh(path):
+    """Rescans a directory right away, e.g. after gob created, moved or removed something in it."""
+    path = os.path.abspath(path)
+    if not os.path.isdir(path):
+        forget(path)
+        return
+    _scan(get_connection(), path, os.stat(path).st_mtime_ns)
+
+def forget(path):
+    """Drops a directory and everything below it from the index."""
+    path = os.path.abspath(path)
+    prefix = path.rstrip(os.sep) + os.sep
+    for cached_path in [p for p in _listings if p == path or p.startswith(prefix)]:
+        del _listings[cached_path]
+    conn = get_connection()
+    with conn:
+        conn.execute('DELETE FROM dirs WHERE path = ? OR substr(path, 1, ?) = ?', (path, len(prefix), prefix))
+        conn.execute('DELETE FROM entries WHERE parent = ? OR substr(parent, 1, ?) = ?', (path, len(prefix), prefix))
+        conn.execute('DELETE FROM sizes WHERE path = ? OR substr(path, 1, ?) = ?', (path, len(prefix), prefix))
+
+RECORD_TICKET_SQL = ('INSERT INTO tickets (ticket_id, customer, state) VALUES (?, ?, ?) '
+                     'ON CONFLICT (ticket_id) DO UPDATE SET customer = COALESCE(excluded.customer, customer), state = excluded.state')
+
+def record_ticket(ticket_id, customer, state):
+    """
+    Records where a ticket lives in the ticket-ID map.
+
+    Args:
+        ticket_id (str): The ticket id, unique across customers.
+        customer (str or None): The customer directory name. None keeps the customer already on record,
+            so solved tickets remember who they belonged to.
+        state (str): 'open' or 'solved'.
+    """
+    conn = get_connection()
+    with conn:
+        conn.execute(RECORD_TICKET_SQL, (ticket_id, customer, state))
+
+def forget_ticket(ticket_id):
+    conn = get_connection()
+    with conn:
+        conn.execute('DELETE FROM tickets WHERE ticket_id = ?', (ticket_id,))
+        conn.execute('DELETE FROM links WHERE ticket_id = ?', (ticket_id,))
+
+def forget_customer_tickets(customer):
+    conn = get_connection()
+    with conn:
+        conn.execute("DELETE FROM tickets WHERE customer = ? AND state = 'open'", (customer,))
+        conn.execute('DELETE FROM ticket_scans WHERE path = ?', (os.path.join(get_gob_dir(), customer, 'tickets'),))
+
+def _mtime_ns(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+def _scanned(conn, paths, scans):
+    """
+    Returns the current mtimes of paths, or None if every one of them still has the mtime
+    recorded by its last rescan in scans (path -> mtime_ns, or None to look them up).
+    """
+    mtimes = [(path, _mtime_ns(path)) for path in paths]
+    if scans is None:
+        scans = {path: row[0] for path in paths
+                 for row in conn.execute('SELECT mtime_ns FROM ticket_scans WHERE path = ?', (path,))}
+    if all(scans.get(path) == mtime_ns for path, mtime_ns in mtimes):
+        return None
+    return mtimes
+
+def _record_scans(conn, mtimes):
+    conn.executemany('DELETE FROM ticket_scans WHERE path = ?', [(path,) for path, mtime_ns in mtimes if mtime_ns is None])
+    conn.executemany('INSERT OR REPLACE INTO ticket_scans (path, mtime_ns) VALUES (?, ?)',
+                     [(path, mtime_ns) for path, mtime_ns in mtimes if mtime_ns is not None])
+
+def rescan_customer(customer, scans=None):
+    """
+    Re-records the open tickets of one customer directory from its (mtime-cached) listing, in
+    one transaction. Skipped when the tickets directory kept the mtime of its last rescan.
+
+    Args:
+        customer (str): The customer directory name.
+        scans (dict, optional): path -> mtime_ns of the last rescans, to spare one query per customer.
+    """
+    conn = get_connection()
+    tickets_dir = os.path.join(get_gob_dir(), customer, 'tickets')
+    mtimes = _scanned(conn, [tickets_dir], scans)
+    if mtimes is None:
+        return
+    tickets = list_directories(tickets_dir)
+    with conn:
+        conn.execute("DELETE FROM tickets WHERE customer = ? AND state = 'open'", (customer,))
+        conn.executemany(RECORD_TICKET_SQL, [(ticket_id, customer, 'open') for ticket_id in tickets])
+        _record_scans(conn, mtimes)
+
+def rescan_solved(scans=None):
+    """
+    Re-records the solved tickets, both plain directories and archived ones, in one
+    transaction. Skipped when neither .solved nor the archive index changed since the last rescan.
+    """
+    from . import archive
+    conn = get_connection()
+    solved_dir = os.path.join(get_gob_dir(), '.solved')
+    mtimes = _scanned(conn, [solved_dir, archive.get_members_path()], scans)
+    if mtimes is None:
+        return
+    tickets = set(list_directories(solved_dir)) | set(archive.list_archived_tickets())
+    known = [row[0] for row in conn.execute("SELECT ticket_id FROM tickets WHERE state = 'solved'")]
+    with conn:
+        conn.executemany('DELETE FROM tickets WHERE ticket_id = ?', [(t,) for t in known if t not in tickets])
+        conn.executemany(RECORD_TICKET_SQL, [(ticket_id, None, 'solved') for ticket_id in sorted(tickets)])
+        _record_scans(conn, mtimes)
+
+def rescan_tickets():
+    """
+    Rebuilds the ticket-ID map for the whole workspace. Only directories whose mtime changed
+    since their last rescan are listed again, so this costs one stat per customer otherwise.
+    """
+    scans = dict(get_connection().execute('SELECT path, mtime_ns FROM ticket_scans'))
+    for customer in list_directories(get_gob_dir()):
+        if not customer.startswith('.'):
+            rescan_customer(customer, scans)
+    rescan_solved(scans)
+
+def _ticket_exists(ticket_id, customer, state):
+    if state == 'open':
+        return customer is not None and os.path.isdir(os.path.join(get_gob_dir(), customer, 'tickets', ticket_id))
+    from . import archive
+    return os.path.isdir(os.path.join(get_gob_dir(), '.solved', ticket_id)) or archive.is_archived(ticket_id)
+
+def locate_ticket(ticket_id):
+    """
+    Finds the customer and state of a ticket from its id alone.
+
+    A stale entry is healed by rescanning only the customer it pointed at and the solved
+    tickets. The whole workspace is rescanned only for an id that was never recorded or
+    that moved to another customer outside gob.
+
+    Returns:
+        tuple: (customer (str or None), state (str)), or None if the ticket does not exist.
+    """
+    conn = get_connection()
+    query = 'SELECT customer, state FROM tickets WHERE ticket_id = ?'
+    row = conn.execute(query, (ticket_id,)).fetchone()
+    if row and _ticket_exists(ticket_id, *row):
+        return row
+    if row:
+        customer, _ = row
+        if customer:
+            rescan_customer(customer)
+        rescan_solved()
+        row = conn.execute(query, (ticket_id,)).fetchone()
+        if row and _ticket_exists(ticket_id, *row):
+            return row
+    # Never recorded, or moved to another customer behind gob's back
+    rescan_tickets()
+    row = conn.execute(query, (ticket_id,)).fetchone()
+    if row and _ticket_exists(ticket_id, *row):
+        return row
+    return None
+
+def match_tickets(pattern, state):
+    """
+    Returns (ticket_id, customer) pairs whose ticket id matches a glob pattern, from the ticket-ID map.
+    """
+    conn = get_connection()
+    if conn.execute('SELECT 1 FROM tickets LIMIT 1').fetchone() is None:
+        rescan_tickets()
+    rows = conn.execute('SELECT ticket_id, customer FROM tickets WHERE ticket_id GLOB ? AND state = ? ORDER BY ticket_id',
+                        (pattern, state)).fetchall()
+    return [(ticket_id, customer) for ticket_id, customer in rows if _ticket_exists(ticket_id, customer, state)]
+
+def ticket_customers(state):
+    """Maps the ids of the tickets in one state to the customer on record for them (None if unknown)."""
+    conn = get_connection()
+    return dict(conn.execute('SELECT ticket_id, customer FROM tickets WHERE state = ?', (state,)))
+
+def link_ticket(ticket_id, url):
+    """Records the GitHub issue a ticket tracks, or drops the link if url is None."""
+    conn = get_connection()
+    with conn:
+        if url is None:
+            conn.execute('DELETE FROM links WHERE ticket_id = ?', (ticket_id,))
+        else:
+            conn.execute('INSERT INTO links (ticket_id, url) VALUES (?, ?) '
+                         'ON CONFLICT (ticket_id) DO UPDATE SET url = excluded.url, issue_state = NULL, labels = NULL, '
+                         'comments = NULL, last_comment_at = NULL, synced_at = NULL',
+                         (ticket_id, url))
+
+def ticket_links():
+    """
+    Returns the linked issues of all tickets.
+
+    Returns:
+        dict: ticket_id -> dict with 'url', 'issue_state', 'labels' (list), 'comments',
+        'last_comment_at' and 'synced_at' (None until the first gob sync).
+    """
+    links = {}
+    rows = get_connection().execute(
+        'SELECT ticket_id, url, issue_state, labels, comments, last_comment_at, synced_at FROM links')
+    for ticket_id, url, issue_state, labels, comments, last_comment_at, synced_at in rows:
+        links[ticket_id] = {
+            'url': url,
+            'issue_state': issue_state,
+            'labels': json.loads(labels) if labels else [],
+            'comments': comments,
+            'last_comment_at': last_comment_at,
+            'synced_at': synced_at,
+        }
+    return links
+
+def record_issue_statuses(statuses):
+    """
+    Stores the result of gob sync.
+
+    Args:
+        statuses (list): (ticket_id, issue_state, labels (list), comments (int), last_comment_at, synced_at) tuples.
+    """
+    conn = get_connection()
+    with conn:
+        conn.executemany('UPDATE links SET issue_state = ?, labels = ?, comments = ?, last_comment_at = ?, synced_at = ? '
+                         'WHERE ticket_id = ?',
+                         [(issue_state, json.dumps(labels), comments, last_comment_at, synced_at, ticket_id)
+                          for ticket_id, issue_state, labels, comments, last_comment_at, synced_at in statuses])
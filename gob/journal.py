@@ -0,0 +1,167 @@
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from .utils import move_directory
+from .index import get_index_dir
+
+MOVE_WORKERS = 4
+
+def get_journal_path():
+    return os.path.join(get_index_dir(), 'journal.json')
+
+def get_trash_dir():
+    return os.path.join(get_index_dir(), 'trash')
+
+def load_journal():
+    """Returns the journal of an interrupted batch, or None if the last batch completed."""
+    try:
+        with open(get_journal_path()) as journal_file:
+            return json.load(journal_file)
+    except FileNotFoundError:
+        return None
+
+def _write_journal(journal):
+    os.makedirs(get_index_dir(), exist_ok=True)
+    tmp_path = get_journal_path() + '.tmp'
+    with open(tmp_path, 'w') as journal_file:
+        json.dump(journal, journal_file)
+        journal_file.flush()
+        os.fsync(journal_file.fileno())
+    os.replace(tmp_path, get_journal_path())
+
+def _run_moves(journal, pending):
+    lock = threading.Lock()
+    errors = []
+
+    def run(move):
+        try:
+            move_directory(move['src'], move['dst'])
+        except OSError as e:
+            with lock:
+                errors.append((move, str(e)))
+            return
+        with lock:
+            move['done'] = True
+            _write_journal(journal)
+
+    with ThreadPoolExecutor(max_workers=MOVE_WORKERS) as executor:
+        list(executor.map(run, pending))
+    return errors
+
+def _finish(journal):
+    if journal.get('purge_dir'):
+        shutil.rmtree(journal['purge_dir'], ignore_errors=True)
+    os.remove(get_journal_path())
+
+def run_batch(operation, moves, purge=False):
+    """
+    Moves many ticket directories as one journaled batch.
+
+    The journal is written before anything moves and updated after every finished move, so
+    an interrupted batch can be resumed or rolled back with resume_batch/rollback_batch.
+    With purge=True the destinations are trash directories that get deleted once every move
+    is done, which makes removals reversible until the very end.
+
+    Args:
+        operation (str): Name of the operation, shown when recovering.
+        moves (list): (src (str), dst (str)) pairs. dst must not exist yet: recovery takes an
+            existing dst as the sign that its move committed.
+        purge (bool): Delete the batch's trash directory after all moves succeeded.
+
+    Returns:
+        list: (move (dict), error_message (str)) for each move that failed.
+    """
+    batch_id = time.strftime('%Y%m%d-%H%M%S')
+    purge_dir = os.path.join(get_trash_dir(), batch_id) if purge else None
+    journal = {
+        'operation': operation,
+        'purge_dir': purge_dir,
+        'moves': [{'src': src, 'dst': os.path.join(purge_dir, os.path.basename(src)) if purge else dst, 'done': False}
+                  for src, dst in moves],
+    }
+    if purge:
+        os.makedirs(purge_dir, exist_ok=True)
+    _write_journal(journal)
+    errors = _run_moves(journal, journal['moves'])
+    if not errors:
+        _finish(journal)
+    return errors
+
+def _settle(src, dst):
+    """
+    Brings an interrupted move_directory(src, dst) into a consistent state.
+
+    dst only appears at the commit point of a move: the rename itself or, across filesystems,
+    the rename of the complete dst + '.partial' copy. A leftover partial copy is dropped, and
+    once dst exists whatever is left of src is the half-deleted original and is removed.
+
+    Returns:
+        bool: True if the move had committed.
+    """
+    partial = dst + '.partial'
+    if os.path.exists(partial):
+        shutil.rmtree(partial)
+    if not os.path.exists(dst):
+        return False
+    if os.path.exists(src):
+        shutil.rmtree(src)
+    return True
+
+def resume_batch(journal):
+    """Finishes the moves an interrupted batch had not done yet."""
+    pending = []
+    errors = []
+    for move in journal['moves']:
+        if move['done']:
+            continue
+        try:
+            move['done'] = _settle(move['src'], move['dst'])
+        except OSError as e:
+            errors.append((move, str(e)))
+            continue
+        if not move['done']:
+            pending.append(move)
+    _write_journal(journal)
+    errors += _run_moves(journal, pending)
+    if not errors:
+        _finish(journal)
+    return errors
+
+def rollback_batch(journal):
+    """
+    Moves everything an interrupted batch already moved back to where it came from.
+
+    Moves that had committed are finished first, so every ticket exists exactly once. The
+    journal is then marked as rolling back before anything moves back: when src and dst both
+    exist after an interrupted rollback, src is the complete copy and dst the half-deleted one.
+    """
+    errors = []
+    if not journal.get('rolling_back'):
+        for move in journal['moves']:
+            try:
+                _settle(move['src'], move['dst'])
+            except OSError as e:
+                errors.append((move, str(e)))
+        if errors:
+            _write_journal(journal)
+            return errors
+        journal['rolling_back'] = True
+        _write_journal(journal)
+    for move in journal['moves']:
+        try:
+            if not _settle(move['dst'], move['src']) and os.path.exists(move['dst']):
+                os.makedirs(os.path.dirname(move['src']), exist_ok=True)
+                move_directory(move['dst'], move['src'])
+            move['done'] = False
+        except OSError as e:
+            errors.append((move, str(e)))
+    if errors:
+        _write_journal(journal)
+    else:
+        if journal.get('purge_dir'):
+            shutil.rmtree(journal['purge_dir'], ignore_errors=True)
+        os.remove(get_journal_path())
+    return errors
@@ -0,0 +1,186 @@
+import datetime
+import fcntl
+import json
+import os
+import subprocess
+import sys
+import time
+import uuid
+from .index import get_index_dir
+
+MAX_ATTEMPTS = 5
+RETRY_DELAY_SECONDS = 30
+
+def get_outbox_dir():
+    return os.path.join(get_index_dir(), 'outbox')
+
+def marker(item_id):
+    """Hidden marker appended to every queued comment, used to detect it was already posted."""
+    return f'<!-- gob-outbox:{item_id} -->'
+
+def _item_path(item_id):
+    return os.path.join(get_outbox_dir(), f'{item_id}.json')
+
+def save_item(item):
+    os.makedirs(get_outbox_dir(), exist_ok=True)
+    tmp_path = _item_path(item['id']) + '.tmp'
+    with open(tmp_path, 'w') as item_file:
+        json.dump(item, item_file)
+        item_file.flush()
+        os.fsync(item_file.fileno())
+    os.replace(tmp_path, _item_path(item['id']))
+
+def enqueue_comment(comment_url, body):
+    """
+    Durably queues an issue comment for delivery and returns the queued item.
+
+    Args:
+        comment_url (str): The issue's comments URL.
+        body (str): The comment body.
+    """
+    item_id = uuid.uuid4().hex
+    item = {
+        'id': item_id,
+        'url': comment_url,
+        'body': f'{body}\n\n{marker(item_id)}',
+        'state': 'pending',
+        'attempts': 0,
+        'created_at': datetime.datetime.now(datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'last_error': None,
+    }
+    save_item(item)
+    return item
+
+def load_item(item_id):
+    """Returns a queued item, or None once it was delivered."""
+    try:
+        with open(_item_path(item_id)) as item_file:
+            return json.load(item_file)
+    except (FileNotFoundError, ValueError):
+        return None
+
+def list_items():
+    """Returns the queued items that were not delivered yet, oldest first."""
+    items = []
+    try:
+        names = os.listdir(get_outbox_dir())
+    except FileNotFoundError:
+        return []
+    for name in names:
+        if name.endswith('.json'):
+            try:
+                with open(os.path.join(get_outbox_dir(), name)) as item_file:
+                    items.append(json.load(item_file))
+            except (OSError, ValueError):
+                continue
+    return sorted(items, key=lambda item: item['created_at'])
+
+def already_posted(client, item):
+    """
+    Checks the issue's comments created since the item was queued for the item's marker.
+
+    Returns:
+        tuple: (posted (bool, or None if the check itself failed), error_message (str or None))
+    """
+    success, comments, error = client.get(item['url'], params={'since': item['created_at'], 'per_page': 100}, use_cache=False)
+    if not success:
+        return None, error
+    return any(marker(item['id']) in (comment.get('body') or '') for comment in comments), None
+
+def deliver(client, item):
+    """
+    Posts one queued comment.
+
+    The attempt is recorded before posting, so if the process dies mid-request the next
+    attempt first checks whether GitHub already has the comment instead of posting it twice.
+    When that check fails the item stays pending without posting, since the earlier attempt
+    may have landed with only its response lost.
+
+    Returns:
+        bool: True if the comment is on GitHub.
+    """
+    if item['attempts']:
+        posted, error = already_posted(client, item)
+        if posted is None:
+            item['last_error'] = f'Could not check for an earlier delivery: {error}'
+            save_item(item)
+            return False
+        if posted:
+            os.remove(_item_path(item['id']))
+            return True
+    item['attempts'] += 1
+    save_item(item)
+    success, _, error = client.post(item['url'], {'body': item['body']})
+    if success:
+        os.remove(_item_path(item['id']))
+        return True
+    item['last_error'] = error
+    if item['attempts'] >= MAX_ATTEMPTS:
+        item['state'] = 'failed'
+    save_item(item)
+    return False
+
+def flush():
+    """
+    Delivers every pending comment. Only one flusher runs at a time.
+
+    Returns:
+        tuple: (delivered (int), still queued (int)), or None if another flusher holds the lock.
+    """
+    from .gh_api_common import get_client
+    os.makedirs(get_outbox_dir(), exist_ok=True)
+    with open(os.path.join(get_outbox_dir(), '.lock'), 'w') as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return None
+        delivered = 0
+        queued = 0
+        client = None
+        for item in list_items():
+            if item['state'] != 'pending':
+                queued += 1
+                continue
+            # Errors are recorded on the item, since the detached flusher has nowhere to report them
+            try:
+                client = client or get_client()
+                success = deliver(client, item)
+            except Exception as e:
+                item['last_error'] = f'{type(e).__name__}: {e}'
+                save_item(item)
+                success = False
+            if success:
+                delivered += 1
+            else:
+                queued += 1
+        return delivered, queued
+
+def retry_failed():
+    """Moves failed items back to pending with a fresh attempt budget."""
+    count = 0
+    for item in list_items():
+        if item['state'] == 'failed':
+            item['state'] = 'pending'
+            item['attempts'] = min(item['attempts'], 1)
+            save_item(item)
+            count += 1
+    return count
+
+def spawn_flusher():
+    """Starts a detached `python -m gob.outbox` that keeps running after the command returns."""
+    subprocess.Popen(
+        [sys.executable, '-m', 'gob.outbox'],
+        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+def run_flusher():
+    """Flushes until nothing is pending, backing off between rounds. Entry point of the detached flusher."""
+    for attempt in range(MAX_ATTEMPTS):
+        result = flush()
+        if result is None or not any(item['state'] == 'pending' for item in list_items()):
+            return
+        time.sleep(RETRY_DELAY_SECONDS * 2 ** attempt)
+
+if __name__ == '__main__':
+    run_flusher()
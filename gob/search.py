@@ -0,0 +1,291 @@
+import click
+import math
+import os
+import re
+import sqlite3
+import time
+from collections import Counter
+from .utils import get_gob_dir, get_customer_dir
+from . import index
+from . import trace
+from . import watch
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9_]{2,}')
+
+# BM25 tuning constants
+K1 = 1.2
+B = 0.75
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower())
+
+def get_connection():
+    """Returns a connection to the inverted index in ~/.gob/.index/search.db."""
+    os.makedirs(index.get_index_dir(), exist_ok=True)
+    conn = sqlite3.connect(os.path.join(index.get_index_dir(), 'search.db'))
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS docs (
+            id INTEGER PRIMARY KEY,
+            path TEXT UNIQUE NOT NULL,
+            customer TEXT,
+            ticket TEXT NOT NULL,
+            solved INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            size INTEGER NOT NULL,
+            length INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS postings (
+            term TEXT NOT NULL,
+            doc_id INTEGER NOT NULL,
+            tf INTEGER NOT NULL,
+            PRIMARY KEY (term, doc_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS postings_doc ON postings (doc_id);
+        CREATE TABLE IF NOT EXISTS ticket_dirs (
+            path TEXT PRIMARY KEY,
+            mtime_ns INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        );
+    """)
+    return conn
+
+def iter_notes_files(known_dirs, known_notes, walked_dirs):
+    """
+    Yields every notes file in the workspace, using the directory index to find tickets.
+
+    A ticket directory whose mtime is the one recorded by the last walk is not listed again:
+    its notes files are the ones already indexed for it. Solved tickets keep the customer
+    the ticket-ID map has on record for them.
+
+    Args:
+        known_dirs (dict): Ticket directory -> mtime_ns at the last walk.
+        known_notes (dict): Ticket directory -> names of the notes files indexed for it.
+        walked_dirs (dict): Filled with ticket directory -> mtime_ns as of this walk.
+
+    Yields:
+        tuple: (path (str), customer (str or None), ticket_id (str), solved (bool))
+    """
+    def notes_names(ticket_path):
+        try:
+            mtime_ns = os.stat(ticket_path).st_mtime_ns
+        except FileNotFoundError:
+            return []
+        walked_dirs[ticket_path] = mtime_ns
+        if known_dirs.get(ticket_path) == mtime_ns:
+            return known_notes.get(ticket_path, [])
+        return [name for name in index.list_files(ticket_path) if name.startswith('notes.')]
+
+    gob_dir = get_gob_dir()
+    for customer in index.list_directories(gob_dir):
+        if customer.startswith('.'):
+            continue
+        tickets_dir = os.path.join(gob_dir, customer, 'tickets')
+        for ticket_id in index.list_directories(tickets_dir):
+            ticket_path = os.path.join(tickets_dir, ticket_id)
+            for name in notes_names(ticket_path):
+                yield os.path.join(ticket_path, name), customer, ticket_id, False
+    solved_dir = os.path.join(gob_dir, '.solved')
+    solved_customers = index.ticket_customers('solved')
+    for ticket_id in index.list_directories(solved_dir):
+        ticket_path = os.path.join(solved_dir, ticket_id)
+        for name in notes_names(ticket_path):
+            yield os.path.join(ticket_path, name), solved_customers.get(ticket_id), ticket_id, True
+
+def notes_file_info(rel_path, solved_customers):
+    """
+    Maps a path relative to ~/.gob to (customer, ticket_id, solved) if it names a notes file, else None.
+
+    Args:
+        rel_path (str): The path relative to ~/.gob.
+        solved_customers (dict): Solved ticket id -> customer, from index.ticket_customers.
+    """
+    parts = rel_path.split(os.sep)
+    if not parts[-1].startswith('notes.'):
+        return None
+    if len(parts) == 4 and parts[1] == 'tickets' and not parts[0].startswith('.'):
+        return parts[0], parts[2], False
+    if len(parts) == 3 and parts[0] == '.solved':
+        return solved_customers.get(parts[1]), parts[1], True
+    return None
+
+def changed_notes_files(conn):
+    """
+    Returns the notes files touched since the last update according to the `gob watch` change
+    log, or None if the whole workspace has to be walked: no watcher, a gap in the log, or a
+    directory-level change such as a ticket being added, solved or removed.
+    """
+    row = conn.execute("SELECT value FROM meta WHERE key = 'watch_seq'").fetchone()
+    changes = watch.changes_since(row[0] if row else None)
+    if changes is None or any(change['is_dir'] for change in changes):
+        return None
+    gob_dir = get_gob_dir()
+    solved_prefix = '.solved' + os.sep
+    solved_customers = index.ticket_customers('solved') if any(change['path'].startswith(solved_prefix) for change in changes) else {}
+    files = {}
+    for change in changes:
+        info = notes_file_info(change['path'], solved_customers)
+        if info:
+            files[os.path.join(gob_dir, change['path'])] = info
+    return [(path, customer, ticket_id, solved) for path, (customer, ticket_id, solved) in files.items()]
+
+@trace.traced('search.update_index')
+def update_index(conn):
+    """
+    Re-indexes notes files whose mtime or size changed and drops files that are gone.
+
+    While `gob watch` runs, only the notes files in its change log are looked at. Otherwise
+    only the ticket directories whose mtime changed since the last walk are listed.
+
+    Returns:
+        int: The number of files that were (re-)indexed.
+    """
+    seq = watch.current_seq()
+    changed = changed_notes_files(conn)
+    known_dirs = walked_dirs = None
+    if changed is None:
+        known = {path: (doc_id, mtime_ns, size, customer) for doc_id, path, mtime_ns, size, customer in
+                 conn.execute('SELECT id, path, mtime_ns, size, customer FROM docs')}
+        known_notes = {}
+        for path in known:
+            ticket_path, _, name = path.rpartition(os.sep)
+            known_notes.setdefault(ticket_path, []).append(name)
+        known_dirs = dict(conn.execute('SELECT path, mtime_ns FROM ticket_dirs'))
+        walked_dirs = {}
+        candidates = iter_notes_files(known_dirs, known_notes, walked_dirs)
+    else:
+        known = {}
+        for path, _, _, _ in changed:
+            row = conn.execute('SELECT id, mtime_ns, size, customer FROM docs WHERE path = ?', (path,)).fetchone()
+            if row:
+                known[path] = row
+        candidates = changed
+    indexed = 0
+    with conn:
+        for path, customer, ticket_id, solved in candidates:
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            previous = known.pop(path, None)
+            if previous and previous[1] == st.st_mtime_ns and previous[2] == st.st_size:
+                if previous[3] != customer:
+                    conn.execute('UPDATE docs SET customer = ? WHERE id = ?', (customer, previous[0]))
+                continue
+            with open(path, encoding='utf-8', errors='replace') as notes_file:
+                terms = Counter(tokenize(notes_file.read()))
+            if previous:
+                conn.execute('DELETE FROM postings WHERE doc_id = ?', (previous[0],))
+                conn.execute('DELETE FROM docs WHERE id = ?', (previous[0],))
+            cursor = conn.execute(
+                'INSERT INTO docs (path, customer, ticket, solved, mtime_ns, size, length) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (path, customer, ticket_id, int(solved), st.st_mtime_ns, st.st_size, sum(terms.values())))
+            conn.executemany('INSERT INTO postings (term, doc_id, tf) VALUES (?, ?, ?)',
+                             [(term, cursor.lastrowid, tf) for term, tf in terms.items()])
+            indexed += 1
+        for doc_id, _, _, _ in known.values():
+            conn.execute('DELETE FROM postings WHERE doc_id = ?', (doc_id,))
+            conn.execute('DELETE FROM docs WHERE id = ?', (doc_id,))
+        if walked_dirs is not None:
+            conn.executemany('DELETE FROM ticket_dirs WHERE path = ?', [(path,) for path in known_dirs.keys() - walked_dirs.keys()])
+            conn.executemany('INSERT OR REPLACE INTO ticket_dirs (path, mtime_ns) VALUES (?, ?)',
+                             [(path, mtime_ns) for path, mtime_ns in walked_dirs.items() if known_dirs.get(path) != mtime_ns])
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('watch_seq', ?)", (seq,))
+    return indexed
+
+@trace.traced('search.query')
+def search_notes(conn, query, customer=None, state='all', limit=20):
+    """
+    Ranks notes files containing every query term by BM25, boosted towards recently edited notes.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the search index.
+        query (str): Free-text query.
+        customer (str, optional): Only return tickets of this customer directory.
+        state (str): 'open', 'solved' or 'all'.
+        limit (int): Maximum number of results.
+
+    Returns:
+        list: (score (float), path (str), customer (str or None), ticket_id (str), solved (bool)) tuples, best first.
+    """
+    terms = sorted(set(tokenize(query)))
+    if not terms:
+        return []
+    total_docs, avg_length = conn.execute('SELECT COUNT(*), AVG(length) FROM docs').fetchone()
+    if not total_docs:
+        return []
+    filters, args = [], []
+    if customer:
+        filters.append('d.customer = ?')
+        args.append(customer)
+    if state != 'all':
+        filters.append('d.solved = ?')
+        args.append(int(state == 'solved'))
+    where = ''.join(f' AND {f}' for f in filters)
+
+    scores = None
+    docs = {}
+    for term in terms:
+        rows = conn.execute(
+            'SELECT d.id, d.path, d.customer, d.ticket, d.solved, d.length, d.mtime_ns, p.tf FROM postings p '
+            f'JOIN docs d ON d.id = p.doc_id WHERE p.term = ?{where}', [term] + args).fetchall()
+        if not rows:
+            return []
+        idf = math.log(1 + (total_docs - len(rows) + 0.5) / (len(rows) + 0.5))
+        term_scores = {}
+        for doc_id, path, doc_customer, ticket_id, solved, length, mtime_ns, tf in rows:
+            norm = K1 * (1 - B + B * length / (avg_length or 1))
+            term_scores[doc_id] = idf * tf * (K1 + 1) / (tf + norm)
+            docs[doc_id] = (path, doc_customer, ticket_id, bool(solved), mtime_ns)
+        if scores is None:
+            scores = term_scores
+        else:
+            scores = {doc_id: score + term_scores[doc_id] for doc_id, score in scores.items() if doc_id in term_scores}
+
+    now = time.time()
+    results = []
+    for doc_id, score in scores.items():
+        path, doc_customer, ticket_id, solved, mtime_ns = docs[doc_id]
+        age_days = max(0, now - mtime_ns / 1e9) / 86400
+        results.append((score * (1 + 0.5 * math.exp(-age_days / 90)), path, doc_customer, ticket_id, solved))
+    results.sort(key=lambda result: result[0], reverse=True)
+    return results[:limit]
+
+def find_snippet(path, terms):
+    try:
+        with open(path, encoding='utf-8', errors='replace') as notes_file:
+            for line in notes_file:
+                lowered = line.lower()
+                if any(term in lowered for term in terms):
+                    return line.strip()
+    except FileNotFoundError:
+        pass
+    return ''
+
+@click.command('search')
+@click.option('-c', '--customer_name', required=False, help='Only search tickets of this customer')
+@click.option('-s', '--state', type=click.Choice(['open', 'solved', 'all']), default='all', help='Ticket state to search')
+@click.option('-n', '--limit', type=int, default=20, help='Maximum number of results')
+@click.argument('query', nargs=-1, required=True)
+def search(customer_name, state, limit, query):
+    """Search ticket notes."""
+    click.echo("Running gob search...")
+    query = ' '.join(query)
+    conn = get_connection()
+    update_index(conn)
+    customer = os.path.basename(get_customer_dir(customer_name)) if customer_name else None
+    results = search_notes(conn, query, customer=customer, state=state, limit=limit)
+    if not results:
+        click.secho(f'🔴 No notes found matching "{query}".', fg='red')
+        return
+    click.secho(f'🟢 Notes matching "{query}":', fg='green')
+    terms = tokenize(query)
+    for _, path, customer, ticket_id, solved in results:
+        owner = customer or '.solved'
+        state = ' (solved)' if solved and customer else ''
+        click.echo(f'  {owner}/{ticket_id}{state}  {path}')
+        snippet = find_snippet(path, terms)
+        if snippet:
+            click.echo(f'      {snippet}')
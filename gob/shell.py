@@ -0,0 +1,218 @@
+import click
+import cmd
+import contextlib
+import glob
+import io
+import json
+import os
+import shlex
+import socket
+import socketserver
+import sys
+from .cli import main, READ_ONLY_COMMANDS, get_socket_path
+from .utils import get_gob_dir
+from . import index
+
+def is_read_only(args):
+    return any(tuple(args[:len(command)]) == command for command in READ_ONLY_COMMANDS)
+
+def run_command(args, color=None):
+    """
+    Runs one gob command line in this process, keeping imported modules, the GitHub session
+    and the directory listings around for the next one. Any error ends only this command,
+    not the session.
+
+    Returns:
+        int: The command's exit code.
+    """
+    try:
+        result = main.main(args=args, prog_name='gob', standalone_mode=False, color=color)
+    except click.exceptions.Abort:
+        click.echo('Aborted!', err=True)
+        return 1
+    except click.ClickException as e:
+        e.show()
+        return e.exit_code
+    except Exception as e:
+        click.secho(f'🔴 Error: {type(e).__name__}: {e}', fg='red', err=True)
+        return 1
+    return result if isinstance(result, int) else 0
+
+class GobShell(cmd.Cmd):
+    intro = 'gob shell: run gob commands without the `gob` prefix. Tab completes commands, options, customers and tickets; exit or Ctrl-D leaves.'
+    prompt = 'gob> '
+
+    def preloop(self):
+        # Import every subcommand up front, so the first command is as fast as the rest
+        ctx = click.Context(main)
+        for name in main.list_commands(ctx):
+            main.get_command(ctx, name)
+        try:
+            import readline
+        except ImportError:
+            return
+        # Keep '-' and '/' inside words so options and paths complete as a whole
+        readline.set_completer_delims(' \t\n"\'')
+        history_path = os.path.join(index.get_index_dir(), 'shell-history')
+        with contextlib.suppress(OSError):
+            readline.read_history_file(history_path)
+        self.history_path = history_path
+
+    def postloop(self):
+        if getattr(self, 'history_path', None):
+            import readline
+            with contextlib.suppress(OSError):
+                readline.write_history_file(self.history_path)
+
+    def emptyline(self):
+        pass
+
+    def default(self, line):
+        try:
+            args = shlex.split(line)
+        except ValueError as e:
+            click.secho(f'🔴 Error: {e}', fg='red')
+            return
+        if args[0] == 'shell':
+            click.secho('🔴 Error: Already in gob shell.', fg='red')
+            return
+        run_command(args)
+
+    def do_help(self, arg):
+        run_command(shlex.split(arg) + ['--help'])
+
+    def do_exit(self, arg):
+        return True
+
+    do_quit = do_exit
+
+    def do_EOF(self, arg):
+        click.echo()
+        return True
+
+    def completenames(self, text, *ignored):
+        names = main.list_commands(click.Context(main)) + ['exit', 'help']
+        return [name for name in names if name.startswith(text)]
+
+    def complete_help(self, text, line, begidx, endidx):
+        offset = len('help ')
+        return self.completedefault(text, line[offset:], begidx - offset, endidx - offset)
+
+    def completedefault(self, text, line, begidx, endidx):
+        try:
+            words = shlex.split(line[:begidx])
+        except ValueError:
+            return []
+        command = main
+        for word in words:
+            if not isinstance(command, click.Group):
+                break
+            subcommand = command.get_command(click.Context(command), word)
+            if subcommand is None:
+                return []
+            command = subcommand
+        if isinstance(command, click.Group):
+            return [name for name in command.list_commands(click.Context(command)) if name.startswith(text)]
+        previous = words[-1] if words else ''
+        for param in command.params:
+            if isinstance(param, click.Option) and not param.is_flag and previous in param.opts:
+                return complete_value(param, text)
+        if text.startswith('-'):
+            opts = [opt for param in command.params if isinstance(param, click.Option) for opt in param.opts + param.secondary_opts]
+            return [opt for opt in opts + ['--help'] if opt.startswith(text)]
+        arguments = [param for param in command.params if isinstance(param, click.Argument)]
+        return complete_value(arguments[0], text) if arguments else []
+
+def complete_value(param, text):
+    """Completion candidates for an option value or argument, served from the in-memory index."""
+    if isinstance(param.type, click.Choice):
+        return [choice for choice in param.type.choices if choice.startswith(text)]
+    if param.name == 'customer_name':
+        customers = [name for name in index.list_directories(get_gob_dir()) if not name.startswith('.')]
+        return [name for name in customers if name.lower().startswith(text.lower())]
+    if param.name in ('ticket_id', 'ticket_ids'):
+        tickets = index.match_tickets(f'{text}*', 'open') + index.match_tickets(f'{text}*', 'solved')
+        return sorted({ticket_id for ticket_id, _ in tickets})
+    if param.name == 'path':
+        return [path + os.sep if os.path.isdir(path) else path for path in glob.glob(os.path.expanduser(text) + '*')]
+    return []
+
+class DaemonHandler(socketserver.StreamRequestHandler):
+    """Answers one forwarded command line with its captured output and exit code."""
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            # A liveness probe from daemon_running
+            return
+        request = json.loads(line)
+        if not is_read_only(request['args']):
+            response = {'refused': True}
+        else:
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+                exit_code = run_command(request['args'], color=request.get('color'))
+            response = {'output': output.getvalue(), 'exit_code': exit_code}
+        self.wfile.write(json.dumps(response).encode() + b'\n')
+
+def daemon_running(socket_path):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        try:
+            client.connect(socket_path)
+            return True
+        except OSError:
+            return False
+
+def serve(socket_path):
+    """Serves read-only commands on a Unix socket, one at a time, until interrupted."""
+    os.makedirs(os.path.dirname(socket_path), exist_ok=True)
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(socket_path)
+    server = socketserver.UnixStreamServer(socket_path, DaemonHandler)
+    os.chmod(socket_path, 0o600)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(socket_path)
+
+def forward(socket_path, args):
+    """
+    Sends a command line to a running daemon and prints its output.
+
+    Only read-only commands are forwarded, so when the daemon goes away mid-command the
+    caller can safely run the command itself.
+
+    Returns:
+        int or None: The command's exit code, or None if no daemon answered it.
+    """
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(socket_path)
+            client.sendall(json.dumps({'args': args, 'color': sys.stdout.isatty()}).encode() + b'\n')
+            with client.makefile('rb') as response_file:
+                response = json.loads(response_file.readline())
+    except (OSError, ValueError):
+        return None
+    if response.get('refused'):
+        return None
+    click.echo(response['output'], nl=False)
+    return response['exit_code']
+
+@click.command('shell')
+@click.option('--serve', 'serve_socket', is_flag=True,
+              help='Instead of a prompt, answer read-only commands of other gob invocations over ~/.gob/.index/gob.sock')
+def shell(serve_socket):
+    """Run gob commands in a persistent session."""
+    click.echo("Running gob shell...")
+    if serve_socket:
+        socket_path = get_socket_path()
+        if daemon_running(socket_path):
+            click.secho(f'🔴 Error: A gob daemon is already serving {socket_path}.', fg='red')
+            return
+        click.secho(f'🟢 Serving read-only gob commands on {socket_path}. Press Ctrl-C to stop.', fg='green')
+        serve(socket_path)
+        return
+    GobShell().cmdloop()
@@ -0,0 +1,119 @@
+import asyncio
+import click
+import datetime
+import os
+import time
+from .utils import get_customer_dir
+from . import index
+
+SYNC_CONCURRENCY = 16
+
+def fetch_issue_status(client, issue_url, known):
+    """
+    Fetches state, labels and last comment time of one linked issue. Blocking, so it runs in an executor.
+
+    Both requests are conditional, and the comments are only asked for when the comment
+    count changed since the last sync.
+
+    Args:
+        client (GitHubClient): The shared client.
+        issue_url (str): The issue's web URL.
+        known (dict): The link as stored by the last sync.
+
+    Returns:
+        tuple: (status (dict or None), error_message (str or None))
+    """
+    from .gh_api_common import issue_api_url
+    api_url = issue_api_url(issue_url)
+    success, issue, error = client.get(api_url)
+    if not success:
+        return None, error
+    comments = issue.get('comments', 0)
+    last_comment_at = known['last_comment_at'] if comments == known['comments'] else None
+    if comments and last_comment_at is None:
+        # Comments are listed oldest first, so with one per page the last page is the newest comment
+        success, page, error = client.get(f'{api_url}/comments', params={'per_page': 1, 'page': comments})
+        if not success:
+            return None, error
+        last_comment_at = page[-1]['created_at'] if page else None
+    return {
+        'issue_state': issue['state'],
+        'labels': [label['name'] for label in issue.get('labels', [])],
+        'comments': comments,
+        'last_comment_at': last_comment_at,
+    }, None
+
+async def fetch_issue_statuses(links, concurrency=SYNC_CONCURRENCY):
+    """
+    Fetches the status of many linked issues at once, at most concurrency at a time, over the
+    pooled session of the shared GitHubClient.
+
+    Args:
+        links (dict): ticket_id -> link, as returned by index.ticket_links().
+
+    Returns:
+        list: (ticket_id, status (dict or None), error_message (str or None)) tuples.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from .gh_api_common import get_client
+    client = get_client()
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+
+    async def fetch(ticket_id, link):
+        async with semaphore:
+            status, error = await loop.run_in_executor(executor, fetch_issue_status, client, link['url'], link)
+            return ticket_id, status, error
+
+    try:
+        return await asyncio.gather(*(fetch(ticket_id, link) for ticket_id, link in links.items()))
+    finally:
+        executor.shutdown(wait=False)
+
+@click.command('sync')
+@click.option('-c', '--customer_name', required=False, help='Only sync tickets of this customer')
+@click.option('-j', '--jobs', type=click.IntRange(min=1), default=SYNC_CONCURRENCY, show_default=True, help='Concurrent GitHub requests')
+@click.option('--solve', 'solve_closed', is_flag=True, help='Offer to solve the tickets whose issue is closed')
+@click.pass_context
+def sync(ctx, customer_name, jobs, solve_closed):
+    """Refresh the GitHub status of linked open tickets."""
+    from .gh_api_common import HoustonError
+    click.echo("Running gob sync...")
+    customer = os.path.basename(get_customer_dir(customer_name)) if customer_name else None
+    open_tickets = dict(index.match_tickets('*', 'open'))
+    links = {ticket_id: link for ticket_id, link in index.ticket_links().items()
+             if ticket_id in open_tickets and (customer is None or open_tickets[ticket_id] == customer)}
+    if not links:
+        click.secho('🔴 No open tickets are linked to an issue. Link one with gob tx link TICKET_ID ISSUE_URL.', fg='red')
+        return
+    start = time.perf_counter()
+    try:
+        results = asyncio.run(fetch_issue_statuses(links, jobs))
+    except (ValueError, HoustonError) as e:
+        click.secho(f'🔴 Error: {e}', fg='red')
+        return
+    synced_at = datetime.datetime.now(datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+    index.record_issue_statuses([
+        (ticket_id, status['issue_state'], status['labels'], status['comments'], status['last_comment_at'], synced_at)
+        for ticket_id, status, _ in results if status
+    ])
+    closed = []
+    for ticket_id, status, error in sorted(results):
+        if error:
+            click.secho(f'🔴 {ticket_id}: {error}', fg='red')
+            continue
+        labels = f"  [{', '.join(status['labels'])}]" if status['labels'] else ''
+        last_comment = f"  last comment {status['last_comment_at']}" if status['last_comment_at'] else ''
+        line = f"  {open_tickets[ticket_id]}/{ticket_id}  {status['issue_state']}{labels}{last_comment}"
+        if status['issue_state'] == 'closed':
+            closed.append(ticket_id)
+            click.secho(f'{line}  ✅ can be solved', fg='green')
+        else:
+            click.echo(line)
+    failed = sum(1 for _, status, _ in results if not status)
+    click.secho(f'🟢 Synced {len(results) - failed} of {len(results)} linked ticket(s) in {time.perf_counter() - start:.1f}s, '
+                f'{len(closed)} closed upstream.', fg='green')
+    if solve_closed and closed:
+        from .tx import solve_ticket
+        ctx.invoke(solve_ticket, customer_name=None, archive_solved=False, ticket_ids=tuple(closed))
@@ -0,0 +1,104 @@
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+_enabled = False
+_spans = []
+_origin = time.perf_counter()
+
+def enable():
+    global _enabled
+    _enabled = True
+
+def is_enabled():
+    return _enabled
+
+def add_span(name, start, end, **args):
+    """Records an already measured span. start and end are time.perf_counter() values."""
+    if _enabled:
+        _spans.append((name, start, end, threading.get_ident(), args))
+
+@contextmanager
+def span(name, **args):
+    """Times the enclosed block as a named span when tracing is enabled."""
+    if not _enabled:
+        yield args
+        return
+    start = time.perf_counter()
+    try:
+        yield args
+    finally:
+        _spans.append((name, start, time.perf_counter(), threading.get_ident(), args))
+
+def traced(name):
+    """Decorator form of span."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def install_network_hooks():
+    """
+    Wraps DNS resolution and TCP connects so HTTP spans can be broken down.
+
+    TTFB is recorded on each HTTP span from requests' Response.elapsed, which measures the
+    time from sending the request until the response headers were parsed.
+    """
+    import socket
+    import urllib3.util.connection
+
+    getaddrinfo = socket.getaddrinfo
+    create_connection = urllib3.util.connection.create_connection
+
+    @functools.wraps(getaddrinfo)
+    def traced_getaddrinfo(host, *args, **kwargs):
+        with span('http.dns', host=str(host)):
+            return getaddrinfo(host, *args, **kwargs)
+
+    @functools.wraps(create_connection)
+    def traced_create_connection(address, *args, **kwargs):
+        with span('http.connect', host=f'{address[0]}:{address[1]}'):
+            return create_connection(address, *args, **kwargs)
+
+    socket.getaddrinfo = traced_getaddrinfo
+    urllib3.util.connection.create_connection = traced_create_connection
+
+def summary_rows():
+    """Aggregates the recorded spans by name: (name, count, total ms, mean ms, max ms), slowest first."""
+    totals = {}
+    for name, start, end, _, _ in _spans:
+        count, total, longest = totals.get(name, (0, 0.0, 0.0))
+        duration = (end - start) * 1000
+        totals[name] = (count + 1, total + duration, max(longest, duration))
+    rows = [(name, count, total, total / count, longest) for name, (count, total, longest) in totals.items()]
+    return sorted(rows, key=lambda row: row[2], reverse=True)
+
+def format_summary():
+    lines = [f"{'span':32} {'count':>7} {'total ms':>10} {'mean ms':>9} {'max ms':>9}"]
+    for name, count, total, mean, longest in summary_rows():
+        lines.append(f"{name:32} {count:7d} {total:10.2f} {mean:9.3f} {longest:9.3f}")
+    return '\n'.join(lines)
+
+def write_chrome_trace(path):
+    """Writes the spans in the Chrome trace event format, viewable in chrome://tracing or Perfetto."""
+    import json
+    events = []
+    for name, start, end, thread_id, args in _spans:
+        events.append({
+            'name': name,
+            'ph': 'X',
+            'ts': round((start - _origin) * 1e6, 1),
+            'dur': round((end - start) * 1e6, 1),
+            'pid': os.getpid(),
+            'tid': thread_id,
+            'args': {key: str(value) for key, value in args.items()},
+        })
+    with open(path, 'w') as trace_file:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, trace_file)
@@ -1,7 +1,13 @@
 import click
+import fnmatch
 import os
 import shutil
-from .utils import get_customer_dir, create_directory, remove_directory, list_directories, open_directory, get_gob_dir
+from .utils import get_customer_dir, create_directory, open_directory, get_gob_dir
+from .journal import load_journal, run_batch, resume_batch, rollback_batch
+from . import archive
+from . import blobs
+from . import du
+from . import index
 
 @click.group()
 def tx():
@@ -27,81 +33,294 @@ def add_ticket(customer_name, ticket_id):
             notes_sh_file.write('#!/bin/bash\n\n# Notes for ticket\n')
         with open(notes_md_path, 'w') as notes_md_file:
             notes_md_file.write('# Notes\n\n')
+        index.refresh(os.path.dirname(ticket_path))
+        index.record_ticket(ticket_id, os.path.basename(customer_dir), 'open')
         click.secho(f'🟢 Ticket {ticket_id} created for customer {customer_name}.', fg='green')
     else:
         click.secho(f'🔴 Ticket {ticket_id} already exists for customer {customer_name}.', fg='red')
 
+def resolve_ticket_ids(base_dir, patterns):
+    """
+    Expands ticket ids and glob patterns (e.g. 'old-*') against the ticket directories in base_dir.
+
+    Returns:
+        tuple: (ticket_ids (list), missing (list of patterns that matched nothing))
+    """
+    return match_ticket_ids(index.list_directories(base_dir), patterns)
+
+def resolve_solved_ticket_ids(patterns):
+    """
+    Expands ticket ids and glob patterns against both the .solved directories and the archive.
+
+    Returns:
+        tuple: (ticket_ids (list), archived_ids (list), missing (list of patterns that matched neither))
+    """
+    ticket_ids, missing_solved = resolve_ticket_ids(os.path.join(get_gob_dir(), '.solved'), patterns)
+    archived_ids, missing_archived = match_ticket_ids(archive.list_archived_tickets(), patterns)
+    archived_ids = [ticket_id for ticket_id in archived_ids if ticket_id not in ticket_ids]
+    missing = [pattern for pattern in missing_solved if pattern in missing_archived]
+    return ticket_ids, archived_ids, missing
+
+def match_ticket_ids(existing, patterns):
+    ticket_ids, missing = [], []
+    for pattern in patterns:
+        if any(char in pattern for char in '*?['):
+            matches = fnmatch.filter(existing, pattern)
+        else:
+            matches = [pattern] if pattern in existing else []
+        if not matches:
+            missing.append(pattern)
+        for ticket_id in matches:
+            if ticket_id not in ticket_ids:
+                ticket_ids.append(ticket_id)
+    return ticket_ids, missing
+
+def find_open_tickets(customer_name, patterns):
+    """
+    Resolves open tickets in one customer's directory, or through the ticket-ID map when no customer is given.
+
+    Returns:
+        tuple: (tickets (list of (ticket_id, customer directory name)), missing (list of patterns that matched nothing))
+    """
+    if customer_name:
+        customer = os.path.basename(get_customer_dir(customer_name))
+        ticket_ids, missing = resolve_ticket_ids(os.path.join(get_gob_dir(), customer, 'tickets'), patterns)
+        return [(ticket_id, customer) for ticket_id in ticket_ids], missing
+    tickets, missing = [], []
+    for pattern in patterns:
+        if any(char in pattern for char in '*?['):
+            matches = index.match_tickets(pattern, 'open')
+        else:
+            location = index.locate_ticket(pattern)
+            matches = [(pattern, location[0])] if location and location[1] == 'open' else []
+        if not matches:
+            missing.append(pattern)
+        tickets.extend(match for match in matches if match not in tickets)
+    return tickets, missing
+
+def find_open_ticket(customer_name, ticket_id):
+    """
+    Returns (ticket path, customer label) of an open ticket, or (None, customer label) if it does not exist.
+    """
+    if customer_name:
+        return os.path.join(get_customer_dir(customer_name), 'tickets', ticket_id), customer_name
+    location = index.locate_ticket(ticket_id)
+    if location and location[1] == 'open':
+        return os.path.join(get_gob_dir(), location[0], 'tickets', ticket_id), location[0]
+    return None, None
+
+def report_missing(missing, customer_name):
+    for ticket_id in missing:
+        if customer_name:
+            click.secho(f'🔴 Error: Ticket {ticket_id} does not exist for customer {customer_name}.', fg='red')
+        else:
+            click.secho(f'🔴 Error: Ticket {ticket_id} does not exist.', fg='red')
+
+def no_interrupted_batch():
+    journal = load_journal()
+    if journal:
+        click.secho(f"🔴 Error: An interrupted 'tx {journal['operation']}' batch was found. "
+                    "Run gob tx recover to resume it, or gob tx recover --rollback to undo it.", fg='red')
+        return False
+    return True
+
+def confirm_batch(action, ticket_ids, suffix=''):
+    if len(ticket_ids) == 1:
+        return click.confirm(f'Are you sure you want to {action} ticket {ticket_ids[0]}{suffix}?', default=False)
+    click.echo(f'Tickets: {", ".join(ticket_ids)}')
+    return click.confirm(f'Are you sure you want to {action} these {len(ticket_ids)} tickets{suffix}?', default=False)
+
+def run_ticket_batch(operation, moves, purge=False):
+    """
+    Moves ticket directories as one journaled batch, or into the trash when purge is set.
+
+    Args:
+        operation (str): Name of the tx command running the batch.
+        moves (list): (ticket_id, src, dst) tuples. dst is ignored when purge is set.
+
+    Returns:
+        list: The ticket ids that were moved.
+    """
+    errors = run_batch(operation, [(src, dst) for _, src, dst in moves], purge=purge)
+    failed = {move['src'] for move, _ in errors}
+    for move, error in errors:
+        click.secho(f"🔴 Error: Failed to move ticket {os.path.basename(move['src'])}: {error}", fg='red')
+    if errors:
+        click.secho('🔴 The batch is incomplete. Run gob tx recover to retry it, or gob tx recover --rollback to undo it.', fg='red')
+    for _, src, dst in moves:
+        index.forget(src)
+    for directory in {os.path.dirname(src) for _, src, _ in moves}:
+        index.refresh(directory)
+    if not purge:
+        for directory in {os.path.dirname(dst) for _, _, dst in moves}:
+            index.refresh(directory)
+    return [ticket_id for ticket_id, src, _ in moves if src not in failed]
+
 @tx.command('solve')
-@click.option('-c', '--customer_name', required=True, help='Name of the customer')
-@click.argument('ticket_id')
-def solve_ticket(customer_name, ticket_id):
-    """Mark a ticket as solved."""
+@click.option('-c', '--customer_name', required=False, help='Name of the customer (looked up from the ticket id if omitted)')
+@click.option('-a', '--archive', 'archive_solved', is_flag=True, help='Pack the solved tickets into the compressed archive (default: $GOB_ARCHIVE_SOLVED)')
+@click.argument('ticket_ids', nargs=-1, required=True)
+def solve_ticket(customer_name, archive_solved, ticket_ids):
+    """Mark one or more tickets as solved. Accepts glob patterns."""
     click.echo("Running gob tx solve...")
-    customer_dir = get_customer_dir(customer_name)
-    ticket_dir = os.path.join(customer_dir, 'tickets')
-    ticket_path = os.path.join(ticket_dir, ticket_id)
-    if not os.path.exists(ticket_path):
-        click.secho(f'🔴 Error: Ticket {ticket_id} does not exist for customer {customer_name}.', fg='red')
+    if not no_interrupted_batch():
         return
-    if click.confirm(f'Are you sure you want to mark ticket {ticket_id} as solved?', default=False):
-        solved_dir = os.path.join(get_gob_dir(), '.solved')
+    solved_dir = os.path.join(get_gob_dir(), '.solved')
+    tickets, missing = find_open_tickets(customer_name, ticket_ids)
+    report_missing(missing, customer_name)
+    for ticket_id, customer in list(tickets):
+        if os.path.exists(os.path.join(solved_dir, ticket_id)):
+            click.secho(f'🔴 Error: Ticket {ticket_id} already exists in the solved tickets.', fg='red')
+            tickets.remove((ticket_id, customer))
+    if not tickets:
+        return
+    if confirm_batch('mark', [ticket_id for ticket_id, _ in tickets], ' as solved'):
         create_directory(solved_dir)
-        shutil.move(ticket_path, os.path.join(solved_dir, ticket_id))
-        click.secho(f'🟢 Ticket {ticket_id} marked as solved and moved to {solved_dir}.', fg='green')
+        customers = dict(tickets)
+        moves = [(ticket_id, os.path.join(get_gob_dir(), customer, 'tickets', ticket_id), os.path.join(solved_dir, ticket_id))
+                 for ticket_id, customer in tickets]
+        for ticket_id in run_ticket_batch('solve', moves):
+            index.record_ticket(ticket_id, customers[ticket_id], 'solved')
+            click.secho(f'🟢 Ticket {ticket_id} marked as solved and moved to {solved_dir}.', fg='green')
+            if archive_solved or archive.archive_enabled():
+                archive.archive_ticket(os.path.join(solved_dir, ticket_id), customer=customers[ticket_id])
+                click.secho(f'🗜️  Ticket {ticket_id} archived.', fg='green')
+        index.refresh(solved_dir)
     else:
         click.echo('Operation cancelled.')
 
 @tx.command('reopen')
-@click.option('-c', '--customer_name', required=True, help='Name of the customer')
-@click.argument('ticket_id')
-def reopen_ticket(customer_name, ticket_id):
-    """Reopen a solved ticket."""
+@click.option('-c', '--customer_name', required=False, help='Name of the customer (defaults to the customer the ticket was solved for)')
+@click.argument('ticket_ids', nargs=-1, required=True)
+def reopen_ticket(customer_name, ticket_ids):
+    """Reopen one or more solved tickets. Accepts glob patterns."""
     click.echo("Running gob tx reopen...")
-    customer_dir = get_customer_dir(customer_name)
+    if not no_interrupted_batch():
+        return
     solved_dir = os.path.join(get_gob_dir(), '.solved')
-    ticket_path = os.path.join(solved_dir, ticket_id)
-    if not os.path.exists(ticket_path):
+    ticket_ids, archived_ids, missing = resolve_solved_ticket_ids(ticket_ids)
+    for ticket_id in missing:
         click.secho(f'🔴 Error: Ticket {ticket_id} does not exist in the solved tickets.', fg='red')
+    customers = {}
+    for ticket_id in ticket_ids + archived_ids:
+        if customer_name:
+            customer = os.path.basename(get_customer_dir(customer_name))
+        else:
+            location = index.locate_ticket(ticket_id)
+            customer = location[0] if location else None
+        if customer is None:
+            click.secho(f'🔴 Error: The customer of ticket {ticket_id} is unknown, pass it with -c.', fg='red')
+        elif os.path.exists(os.path.join(get_gob_dir(), customer, 'tickets', ticket_id)):
+            click.secho(f'🔴 Error: Ticket {ticket_id} already exists for customer {customer}.', fg='red')
+        else:
+            customers[ticket_id] = customer
+    ticket_ids = [t for t in ticket_ids if t in customers]
+    archived_ids = [t for t in archived_ids if t in customers]
+    if not customers:
         return
-    ticket_dir = os.path.join(customer_dir, 'tickets')
-    create_directory(ticket_dir)
-    shutil.move(ticket_path, os.path.join(ticket_dir, ticket_id))
-    click.secho(f'🟢 Ticket {ticket_id} reopened and moved back to customer {customer_name}.', fg='green')
+    for customer in set(customers.values()):
+        create_directory(os.path.join(get_gob_dir(), customer, 'tickets'))
+    moves = [(ticket_id, os.path.join(solved_dir, ticket_id), os.path.join(get_gob_dir(), customers[ticket_id], 'tickets', ticket_id))
+             for ticket_id in ticket_ids]
+    reopened = run_ticket_batch('reopen', moves) if moves else []
+    for ticket_id in archived_ids:
+        ticket_dir = os.path.join(get_gob_dir(), customers[ticket_id], 'tickets')
+        archive.extract_ticket(ticket_id, os.path.join(ticket_dir, ticket_id))
+        index.refresh(ticket_dir)
+        reopened.append(ticket_id)
+    for ticket_id in reopened:
+        index.record_ticket(ticket_id, customers[ticket_id], 'open')
+        click.secho(f'🟢 Ticket {ticket_id} reopened and moved back to customer {customer_name or customers[ticket_id]}.', fg='green')
 
 @tx.command('rm')
-@click.option('-c', '--customer_name', required=False, help='Name of the customer')
-@click.option('-s', '--solved', is_flag=True, help='Remove solved ticket')
-@click.argument('ticket_id')
-def remove_ticket(customer_name, solved, ticket_id):
-    """Remove a ticket."""
+@click.option('-c', '--customer_name', required=False, help='Name of the customer (looked up from the ticket id if omitted)')
+@click.option('-s', '--solved', is_flag=True, help='Remove solved tickets')
+@click.argument('ticket_ids', nargs=-1, required=True)
+def remove_ticket(customer_name, solved, ticket_ids):
+    """Remove one or more tickets. Accepts glob patterns."""
     click.echo("Running gob tx rm...")
+    if not no_interrupted_batch():
+        return
     gob_dir = get_gob_dir()
+    archived_ids = []
     if solved:
         solved_dir = os.path.join(gob_dir, '.solved')
-        ticket_path = os.path.join(solved_dir, ticket_id)
-        if not os.path.exists(ticket_path):
+        ticket_ids, archived_ids, missing = resolve_solved_ticket_ids(ticket_ids)
+        for ticket_id in missing:
             click.secho(f'🔴 Error: Solved ticket {ticket_id} does not exist.', fg='red')
+        if not ticket_ids and not archived_ids:
             return
-        if click.confirm(f'Are you sure you want to remove solved ticket {ticket_id}?', default=False):
-            remove_directory(ticket_path)
-            click.secho(f'🟢 Solved ticket {ticket_id} removed.', fg='green')
-        else:
-            click.echo('Operation cancelled.')
+        moves = [(ticket_id, os.path.join(solved_dir, ticket_id), None) for ticket_id in ticket_ids]
+        if moves:
+            click.echo(du.describe_reclaimable([src for _, src, _ in moves]))
+        confirmed = confirm_batch('remove solved', ticket_ids + archived_ids)
     else:
-        if not customer_name:
-            click.secho('🔴 Error: Customer name is required if not removing solved tickets.', fg='red')
-            return
-        customer_dir = get_customer_dir(customer_name)
-        ticket_dir = os.path.join(customer_dir, 'tickets')
-        ticket_path = os.path.join(ticket_dir, ticket_id)
-        if not os.path.exists(ticket_path):
-            click.secho(f'🔴 Error: Ticket {ticket_id} does not exist for customer {customer_name}.', fg='red')
+        tickets, missing = find_open_tickets(customer_name, ticket_ids)
+        report_missing(missing, customer_name)
+        if not tickets:
             return
-        if click.confirm(f'Are you sure you want to remove ticket {ticket_id} for customer {customer_name}?', default=False):
-            remove_directory(ticket_path)
-            click.secho(f'🟢 Ticket {ticket_id} for customer {customer_name} removed.', fg='green')
+        moves = [(ticket_id, os.path.join(gob_dir, customer, 'tickets', ticket_id), None) for ticket_id, customer in tickets]
+        click.echo(du.describe_reclaimable([src for _, src, _ in moves]))
+        suffix = f' for customer {customer_name}' if customer_name else ''
+        confirmed = confirm_batch('remove', [ticket_id for ticket_id, _ in tickets], suffix)
+    if not confirmed:
+        click.echo('Operation cancelled.')
+        return
+    removed = run_ticket_batch('rm', moves, purge=True) if moves else []
+    removed += [ticket_id for ticket_id in archived_ids if archive.tombstone_ticket(ticket_id)]
+    for ticket_id in removed:
+        index.forget_ticket(ticket_id)
+        if solved:
+            click.secho(f'🟢 Solved ticket {ticket_id} removed.', fg='green')
         else:
-            click.echo('Operation cancelled.')
+            owner = customer_name or dict(tickets)[ticket_id]
+            click.secho(f'🟢 Ticket {ticket_id} for customer {owner} removed.', fg='green')
+
+@tx.command('archive')
+@click.argument('ticket_ids', nargs=-1)
+def archive_solved_tickets(ticket_ids):
+    """Pack solved tickets (all of them by default) into the compressed archive."""
+    click.echo("Running gob tx archive...")
+    solved_dir = os.path.join(get_gob_dir(), '.solved')
+    if ticket_ids:
+        ticket_ids, missing = resolve_ticket_ids(solved_dir, ticket_ids)
+        for ticket_id in missing:
+            click.secho(f'🔴 Error: Solved ticket {ticket_id} does not exist.', fg='red')
+    else:
+        ticket_ids = index.list_directories(solved_dir)
+    if not ticket_ids:
+        click.secho('🔴 No solved tickets to archive.', fg='red')
+        return
+    for ticket_id in ticket_ids:
+        ticket_path = os.path.join(solved_dir, ticket_id)
+        archive.archive_ticket(ticket_path)
+        index.forget(ticket_path)
+        click.secho(f'🗜️  Ticket {ticket_id} archived.', fg='green')
+    index.refresh(solved_dir)
+
+@tx.command('recover')
+@click.option('--rollback', is_flag=True, help='Undo the interrupted batch instead of finishing it')
+def recover_batch(rollback):
+    """Resume or roll back an interrupted solve, reopen or rm batch."""
+    click.echo("Running gob tx recover...")
+    journal = load_journal()
+    if not journal:
+        click.secho('🟢 No interrupted batch found.', fg='green')
+        return
+    if journal.get('rolling_back') and not rollback:
+        click.secho(f"🔴 Error: The rollback of the interrupted 'tx {journal['operation']}' batch was interrupted. "
+                    "Run gob tx recover --rollback to finish it.", fg='red')
+        return
+    errors = rollback_batch(journal) if rollback else resume_batch(journal)
+    for move, error in errors:
+        click.secho(f"🔴 Error: Failed to move {move['src']}: {error}", fg='red')
+    for move in journal['moves']:
+        index.refresh(os.path.dirname(move['src']))
+        if not journal.get('purge_dir'):
+            index.refresh(os.path.dirname(move['dst']))
+    if not errors:
+        action = 'rolled back' if rollback else 'completed'
+        click.secho(f"🟢 Interrupted 'tx {journal['operation']}' batch {action}.", fg='green')
 
 @tx.command('ls')
 @click.option('-c', '--customer_name', required=False, help='Name of the customer')
@@ -112,20 +331,23 @@ def list_tickets(customer_name, solved):
     gob_dir = get_gob_dir()
     if solved:
         solved_dir = os.path.join(gob_dir, '.solved')
-        tickets = list_directories(solved_dir)
-        if not tickets:
+        tickets = index.list_directories(solved_dir)
+        archived = archive.list_archived_tickets()
+        if not tickets and not archived:
             click.secho('🔴 No solved tickets found.', fg='red')
         else:
             click.secho('🟢 Solved tickets:', fg='green')
             for ticket in tickets:
                 click.echo(f'  {ticket}')
+            for ticket in archived:
+                click.echo(f'  {ticket} (archived)')
     else:
         if not customer_name:
             click.secho('🔴 Error: Customer name is required if not listing solved tickets.', fg='red')
             return
         customer_dir = get_customer_dir(customer_name)
         ticket_dir = os.path.join(customer_dir, 'tickets')
-        tickets = list_directories(ticket_dir)
+        tickets = index.list_directories(ticket_dir)
         if not tickets:
             click.secho(f'🔴 No tickets found for customer {customer_name}.', fg='red')
         else:
@@ -134,34 +356,61 @@ def list_tickets(customer_name, solved):
                 click.echo(f'  {ticket}')
 
 @tx.command('open')
-@click.option('-c', '--customer_name', required=True, help='Name of the customer')
+@click.option('-c', '--customer_name', required=False, help='Name of the customer (looked up from the ticket id if omitted)')
 @click.argument('ticket_id')
 def open_ticket(customer_name, ticket_id):
     """Open a ticket directory with the default editor or 'open' command."""
     click.echo("Running gob tx open...")
-    customer_dir = get_customer_dir(customer_name)
-    ticket_dir = os.path.join(customer_dir, 'tickets')
-    ticket_path = os.path.join(ticket_dir, ticket_id)
-    if not os.path.exists(ticket_path):
-        click.secho(f'🔴 Error: Ticket {ticket_id} does not exist for customer {customer_name}.', fg='red')
+    ticket_path, _ = find_open_ticket(customer_name, ticket_id)
+    if not ticket_path or not os.path.exists(ticket_path):
+        report_missing([ticket_id], customer_name)
         return
     open_directory(ticket_path)
 
 @tx.command('mv')
-@click.option('-c', '--customer_name', required=True, help='Name of the customer')
+@click.option('-c', '--customer_name', required=False, help='Name of the customer (looked up from the ticket id if omitted)')
 @click.option('-p', '--path', required=True, help='Path of the file or directory to move')
+@click.option('-d', '--dedup', is_flag=True, help='Store files in the deduplicated attachment store (default: $GOB_DEDUP)')
 @click.argument('ticket_id')
-def move_to_ticket(customer_name, path, ticket_id):
+def move_to_ticket(customer_name, path, dedup, ticket_id):
     """Move a file or directory to a ticket directory."""
     click.echo("Running gob tx mv...")
-    customer_dir = get_customer_dir(customer_name)
-    ticket_dir = os.path.join(customer_dir, 'tickets')
-    ticket_path = os.path.join(ticket_dir, ticket_id)
-    if not os.path.exists(ticket_path):
-        click.secho(f'🔴 Error: Ticket {ticket_id} does not exist for customer {customer_name}.', fg='red')
+    ticket_path, customer = find_open_ticket(customer_name, ticket_id)
+    if not ticket_path or not os.path.exists(ticket_path):
+        report_missing([ticket_id], customer_name)
         return
     if not os.path.exists(path):
         click.secho(f'🔴 Error: Path {path} does not exist.', fg='red')
         return
-    shutil.move(path, ticket_path)
-    click.secho(f'🟢 Moved {path} to ticket {ticket_id} for customer {customer_name}.', fg='green')
\ No newline at end of file
+    name = os.path.basename(os.path.normpath(path))
+    if os.path.lexists(os.path.join(ticket_path, name)):
+        click.secho(f'🔴 Error: Ticket {ticket_id} already has a {name}.', fg='red')
+        return
+    if dedup or blobs.dedup_enabled():
+        stored, duplicates = blobs.store_path(path, ticket_path)
+        click.echo(f'🧬 {stored} file(s) linked from the attachment store, {duplicates} already stored.')
+    else:
+        shutil.move(path, ticket_path)
+    index.refresh(ticket_path)
+    click.secho(f'🟢 Moved {path} to ticket {ticket_id} for customer {customer}.', fg='green')
+
+@tx.command('link')
+@click.option('-r', '--remove', is_flag=True, help='Remove the link instead')
+@click.argument('ticket_id')
+@click.argument('issue_url', required=False)
+def link_ticket(remove, ticket_id, issue_url):
+    """Link a ticket to the GitHub issue gob sync tracks it by."""
+    from .gh_api_common import issue_api_url
+    click.echo("Running gob tx link...")
+    if not index.locate_ticket(ticket_id):
+        report_missing([ticket_id], None)
+        return
+    if remove:
+        index.link_ticket(ticket_id, None)
+        click.secho(f'🟢 Ticket {ticket_id} is no longer linked.', fg='green')
+        return
+    if not issue_url or not issue_api_url(issue_url):
+        click.secho('🔴 Error: Expected a GitHub issue URL like https://github.com/OWNER/REPO/issues/123.', fg='red')
+        return
+    index.link_ticket(ticket_id, issue_url)
+    click.secho(f'🟢 Ticket {ticket_id} linked to {issue_url}.', fg='green')
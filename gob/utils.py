@@ -1,8 +1,13 @@
 # utils.py
+import errno
 import os
 import click
 import shutil
 
+INDEX_DIR_NAME = '.index'
+ARCHIVE_DIR_NAME = '.archive'
+BLOBS_DIR_NAME = '.blobs'
+
 def get_gob_dir():
     return os.path.join(os.path.expanduser('~'), '.gob')
 
@@ -21,10 +26,25 @@ def remove_directory(path):
         return True
     return False
 
-def list_directories(path):
-    if os.path.exists(path):
-        return [d for d in os.listdir(path) if os.path.isdir(os.path.join(path, d))]
-    return []
+def move_directory(src, dst):
+    """
+    Moves a directory with an atomic os.rename when src and dst share a filesystem.
+
+    Across filesystems the tree is copied to dst + '.partial' first and only renamed into
+    place once the copy is complete, so an interrupted move never leaves a half-copied dst.
+    """
+    try:
+        os.rename(src, dst)
+        return
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+    partial = dst + '.partial'
+    if os.path.exists(partial):
+        shutil.rmtree(partial)
+    shutil.copytree(src, partial, symlinks=True)
+    os.rename(partial, dst)
+    shutil.rmtree(src)
 
 def open_directory(path):
     editor = os.getenv('EDITOR', 'open')
@@ -0,0 +1,325 @@
+import click
+import errno
+import fcntl
+import json
+import os
+import struct
+import sys
+import time
+from .utils import get_gob_dir, INDEX_DIR_NAME, ARCHIVE_DIR_NAME, BLOBS_DIR_NAME
+from .index import get_index_dir
+
+# inotify event bits, from <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_ONLYDIR
+EVENT_HEADER = struct.Struct('iIII')
+
+# Directories below ~/.gob that hold gob's own state rather than workspace content
+SKIPPED_DIRS = {INDEX_DIR_NAME, ARCHIVE_DIR_NAME, BLOBS_DIR_NAME}
+# Once the log grows past this many entries, the older half is dropped
+MAX_LOG_ENTRIES = 10000
+POLL_INTERVAL_SECONDS = 2
+
+def get_log_path():
+    return os.path.join(get_index_dir(), 'changes.jsonl')
+
+def get_lock_path():
+    return os.path.join(get_index_dir(), 'watch.lock')
+
+def read_log():
+    """Returns the change log entries, oldest first."""
+    entries = []
+    try:
+        with open(get_log_path()) as log_file:
+            for line in log_file:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    # A line the watcher is still writing
+                    break
+    except FileNotFoundError:
+        pass
+    return entries
+
+def is_running():
+    """The watcher holds an exclusive lock on .index/watch.lock for as long as it runs."""
+    try:
+        with open(get_lock_path()) as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return True
+    except FileNotFoundError:
+        pass
+    return False
+
+def current_seq():
+    """Returns the sequence number of the last complete log entry, reading only the end of the log."""
+    try:
+        with open(get_log_path(), 'rb') as log_file:
+            end = log_file.seek(0, os.SEEK_END)
+            block = 4096
+            while True:
+                start = max(0, end - block)
+                log_file.seek(start)
+                lines = log_file.read(end - start).split(b'\n')
+                # The first line may start mid-entry, the last one may still be written
+                for line in reversed(lines if start == 0 else lines[1:]):
+                    try:
+                        return json.loads(line)['seq']
+                    except ValueError:
+                        continue
+                if start == 0:
+                    return 0
+                block *= 4
+    except FileNotFoundError:
+        return 0
+
+def changes_since(seq):
+    """
+    Returns the changes logged after sequence number seq.
+
+    Consumers remember the last sequence number they applied and only look at the newer
+    entries. The log is only complete while the watcher keeps running: every (re)start of the
+    watcher and every inotify queue overflow is logged as a 'reset' entry.
+
+    Args:
+        seq (int or None): The last sequence number the consumer applied.
+
+    Returns:
+        list or None: Entries with 'seq', 'event' ('create', 'delete' or 'modify'), 'path'
+        (relative to ~/.gob) and 'is_dir', or None if the consumer has to rescan everything.
+    """
+    if seq is None or not is_running():
+        return None
+    if seq == current_seq():
+        return []
+    entries = read_log()
+    if not entries or entries[0]['seq'] > seq + 1:
+        return None
+    changes = [entry for entry in entries if entry['seq'] > seq]
+    if any(entry['event'] == 'reset' for entry in changes):
+        return None
+    return changes
+
+class ChangeLog:
+    """Appends entries with increasing sequence numbers to .index/changes.jsonl."""
+    def __init__(self):
+        entries = read_log()
+        self.seq = entries[-1]['seq'] if entries else 0
+        self.length = len(entries)
+
+    def append(self, changes):
+        if not changes:
+            return
+        lines = []
+        previous = None
+        for event, path, is_dir in changes:
+            if (event, path, is_dir) == previous:
+                continue
+            previous = (event, path, is_dir)
+            self.seq += 1
+            lines.append(json.dumps({'seq': self.seq, 'time': time.time(), 'event': event, 'path': path, 'is_dir': is_dir}) + '\n')
+        with open(get_log_path(), 'a') as log_file:
+            log_file.writelines(lines)
+        self.length += len(lines)
+        if self.length > MAX_LOG_ENTRIES:
+            self.compact()
+
+    def compact(self):
+        entries = read_log()[-(MAX_LOG_ENTRIES // 2):]
+        tmp_path = get_log_path() + '.tmp'
+        with open(tmp_path, 'w') as log_file:
+            log_file.writelines(json.dumps(entry) + '\n' for entry in entries)
+        os.replace(tmp_path, get_log_path())
+        self.length = len(entries)
+
+    def reset(self):
+        self.append([('reset', '', True)])
+
+def is_skipped(rel_path):
+    return rel_path.split(os.sep)[0] in SKIPPED_DIRS
+
+class Inotify:
+    """Recursive directory watches on top of the raw inotify syscalls."""
+    def __init__(self):
+        import ctypes
+        import ctypes.util
+        self.ctypes = ctypes
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            self.raise_errno('inotify_init1')
+        self.paths = {}
+
+    def raise_errno(self, what):
+        error = self.ctypes.get_errno()
+        raise OSError(error, os.strerror(error), what)
+
+    def add_tree(self, root):
+        """Watches root and every directory below it. Raises OSError(ENOSPC) once the watch limit is hit."""
+        gob_dir = get_gob_dir()
+        for dirpath, dirs, _ in os.walk(root):
+            dirs[:] = [name for name in dirs if not is_skipped(os.path.relpath(os.path.join(dirpath, name), gob_dir))]
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(dirpath), WATCH_MASK)
+            if wd < 0:
+                if self.ctypes.get_errno() == errno.ENOENT:
+                    continue
+                self.raise_errno(dirpath)
+            self.paths[wd] = dirpath
+
+    def read_events(self):
+        """Blocks until events arrive. Yields (watch descriptor, mask, name) tuples."""
+        data = os.read(self.fd, 64 * 1024)
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, name_length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + name_length].rstrip(b'\0'))
+            offset += name_length
+            yield wd, mask, name
+
+    def close(self):
+        os.close(self.fd)
+
+def watch_inotify(log):
+    gob_dir = get_gob_dir()
+    inotify = Inotify()
+    try:
+        inotify.add_tree(gob_dir)
+        log.reset()
+        while True:
+            changes = []
+            for wd, mask, name in inotify.read_events():
+                if mask & IN_Q_OVERFLOW:
+                    changes.append(('reset', '', True))
+                    continue
+                if mask & IN_IGNORED:
+                    inotify.paths.pop(wd, None)
+                    continue
+                parent = inotify.paths.get(wd)
+                if parent is None or not name:
+                    continue
+                path = os.path.join(parent, name)
+                rel_path = os.path.relpath(path, gob_dir)
+                if is_skipped(rel_path):
+                    continue
+                is_dir = bool(mask & IN_ISDIR)
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    event = 'create'
+                    if is_dir:
+                        inotify.add_tree(path)
+                elif mask & (IN_DELETE | IN_MOVED_FROM):
+                    event = 'delete'
+                else:
+                    event = 'modify'
+                changes.append((event, rel_path, is_dir))
+            log.append(changes)
+    finally:
+        inotify.close()
+
+def snapshot(path, gob_dir, state=None):
+    """Maps every path below path (relative to gob_dir) to (mtime_ns, size, is_dir)."""
+    state = {} if state is None else state
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                rel_path = os.path.relpath(entry.path, gob_dir)
+                if is_skipped(rel_path):
+                    continue
+                st = entry.stat(follow_symlinks=False)
+                is_dir = entry.is_dir(follow_symlinks=False)
+                state[rel_path] = (st.st_mtime_ns, st.st_size, is_dir)
+                if is_dir:
+                    snapshot(entry.path, gob_dir, state)
+    except (FileNotFoundError, NotADirectoryError):
+        pass
+    return state
+
+def watch_polling(log, interval):
+    """Fallback when inotify is unavailable or out of watches: diffs a full snapshot every interval seconds."""
+    gob_dir = get_gob_dir()
+    previous = snapshot(gob_dir, gob_dir)
+    log.reset()
+    while True:
+        time.sleep(interval)
+        current = snapshot(gob_dir, gob_dir)
+        changes = [('delete', path, previous[path][2]) for path in sorted(previous.keys() - current.keys())]
+        for path, (mtime_ns, size, is_dir) in sorted(current.items()):
+            if path not in previous:
+                changes.append(('create', path, is_dir))
+            elif not is_dir and previous[path][:2] != (mtime_ns, size):
+                changes.append(('modify', path, is_dir))
+        log.append(changes)
+        previous = current
+
+def run_watcher(interval=POLL_INTERVAL_SECONDS):
+    """
+    Logs workspace changes until interrupted. Uses inotify and falls back to polling when
+    inotify is unavailable or its instance or watch limits are hit.
+
+    Returns:
+        bool: False if another watcher is already running.
+    """
+    os.makedirs(get_index_dir(), exist_ok=True)
+    with open(get_lock_path(), 'w') as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        log = ChangeLog()
+        try:
+            watch_inotify(log)
+        except (OSError, AttributeError) as e:
+            if isinstance(e, OSError) and e.errno not in {errno.ENOSPC, errno.EMFILE, errno.ENOSYS}:
+                raise
+            click.secho(f'🟡 inotify unavailable ({e}), polling every {interval:g}s instead.', fg='yellow')
+            watch_polling(log, interval)
+    return True
+
+def spawn_watcher(interval):
+    """Starts a detached `python -m gob.watch` that keeps running after the command returns."""
+    import subprocess
+    subprocess.Popen(
+        [sys.executable, '-m', 'gob.watch', str(interval)],
+        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+@click.command('watch')
+@click.option('-b', '--background', is_flag=True, help='Keep watching in a detached process')
+@click.option('-i', '--interval', type=click.FloatRange(min=0.1), default=POLL_INTERVAL_SECONDS, show_default=True,
+              help='Seconds between scans when falling back to polling')
+@click.option('--status', is_flag=True, help='Only report whether a watcher is running')
+def watch(background, interval, status):
+    """Log workspace changes so other commands only apply the deltas."""
+    click.echo("Running gob watch...")
+    if is_running():
+        click.secho(f'🟢 A watcher is running, change log at sequence {current_seq()}.', fg='green')
+        return
+    if status:
+        click.secho('🔴 No watcher is running.', fg='red')
+        return
+    if background:
+        spawn_watcher(interval)
+        click.secho('🟢 Watcher started in the background.', fg='green')
+        return
+    click.secho(f'🟢 Watching {get_gob_dir()}. Press Ctrl-C to stop.', fg='green')
+    try:
+        run_watcher(interval)
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    try:
+        run_watcher(float(sys.argv[1]) if len(sys.argv) > 1 else POLL_INTERVAL_SECONDS)
+    except KeyboardInterrupt:
+        pass
@@ -1,7 +1,15 @@
 import click
-import webbrowser
-import re
-from .gh_api_common import list_issues, post_issue_comment, HoustonError
+import datetime
+import json
+import os
+from .gh_api_common import iter_issues, get_client, build_headers, HoustonError
+from .index import get_index_dir
+from . import outbox
+
+# Oldest issue update considered when nothing is cached yet
+DEFAULT_SINCE = "2025-01-01T00:00:00Z"
+# How long an issue from an earlier week is trusted before asking GitHub for this week's again
+STALE_ISSUE_TTL_SECONDS = 60 * 60
 
 @click.group()
 def wu():
@@ -9,20 +17,29 @@ def wu():
     pass
 
 @wu.command('get')
-def get_latest_weekly_update():
+@click.option('-r', '--refresh', is_flag=True, help='Check GitHub for a newer issue even if the cached one is still fresh')
+def get_latest_weekly_update(refresh):
     """Get the latest weekly update issue."""
     click.echo("Running gob wu get...")
     try:
-        questions_of_the_week, _ = get_latest_weekly_update_issue(get_params=False)
+        questions_of_the_week, _ = get_latest_weekly_update_issue(get_params=False, refresh=refresh)
     except HoustonError as e:
         click.secho(f"Error: {e}", fg='red')
 
 @wu.command('post')
-def post_weekly_update():
+@click.option('-w', '--wait', is_flag=True, help='Deliver the comment before returning instead of in the background')
+@click.option('-r', '--refresh', is_flag=True, help='Check GitHub for a newer issue even if the cached one is still fresh')
+def post_weekly_update(wait, refresh):
     """Post a weekly update."""
     click.echo("Running gob wu post...")
     try:
-        questions_of_the_week, comment_url = get_latest_weekly_update_issue(get_params=True)
+        # Fail before asking the questions, not after, when the comment could never be posted
+        build_headers()
+    except ValueError as e:
+        click.secho(f"Error: {e}", fg='red')
+        return
+    try:
+        questions_of_the_week, comment_url = get_latest_weekly_update_issue(get_params=True, refresh=refresh)
         questions = [
             "**Your response to the question of the week (QOTW)**",
             "**Do you have any accounts at risk?**",
@@ -43,45 +60,148 @@ def post_weekly_update():
             responses.append(question)  # Add the question itself
             response = click.prompt(f"❓ {question}")
             responses.append(response)  # Add the user's response
-        comment_data = {
-            "body": "\n".join(responses)
-        }
-        success, _, error = post_issue_comment(comment_url, comment_data)
-        if success:
+        # Queue the comment durably first so a timeout or 5xx never loses the answers
+        item = outbox.enqueue_comment(comment_url, "\n".join(responses))
+        if not wait:
+            outbox.spawn_flusher()
+            click.secho("📮 Weekly update queued and being posted in the background. Check it with gob wu outbox.", fg='green')
+            return
+        # Deliver under the outbox lock, so a background flusher cannot post the same item twice
+        if outbox.flush() is None:
+            click.echo("⏳ Another flusher is already delivering the outbox. Check it with gob wu outbox.")
+            return
+        queued = outbox.load_item(item['id'])
+        if queued is None:
             click.secho("✅ Request Was Successful", fg='green')
         else:
-            click.secho(f"Error: {error}", fg='red')
+            click.secho(f"Error: {queued['last_error']}", fg='red')
+            click.echo("📮 Your answers are kept in the outbox. Retry with gob wu outbox --flush.")
+        waited = get_client().scheduler.waited
+        if waited:
+            click.echo(f"⏳ Waited {waited:.1f}s for GitHub rate limits and retries.")
     except HoustonError as e:
         click.secho(f"Error: {e}", fg='red')
 
-def get_latest_weekly_update_issue(get_params=False):
-    # Fetch issues with the `since` parameter and sorted by created date in descending order with label team-meeting
-    success, issues, error = list_issues(
+@wu.command('outbox')
+@click.option('-f', '--flush', 'flush_now', is_flag=True, help='Deliver pending comments now')
+@click.option('-r', '--retry', is_flag=True, help='Move failed comments back to pending')
+def show_outbox(flush_now, retry):
+    """Show queued weekly update comments."""
+    click.echo("Running gob wu outbox...")
+    if retry:
+        click.echo(f"🔁 {outbox.retry_failed()} failed comment(s) moved back to pending.")
+    if flush_now:
+        result = outbox.flush()
+        if result is None:
+            click.echo("⏳ Another flusher is already delivering the outbox.")
+        else:
+            click.echo(f"📬 Delivered {result[0]} comment(s).")
+    items = outbox.list_items()
+    if not items:
+        click.secho('🟢 Outbox is empty.', fg='green')
+        return
+    for item in items:
+        icon = '🔴' if item['state'] == 'failed' else '⏳'
+        click.echo(f"{icon} {item['created_at']}  {item['state']:7}  attempts={item['attempts']}  {item['url']}")
+        if item['last_error']:
+            click.echo(f"      {item['last_error']}")
+
+def get_wu_cache_path():
+    return os.path.join(get_index_dir(), 'wu-cache.json')
+
+def week_start(moment):
+    """Returns the Monday 00:00 UTC of the week moment falls in."""
+    return (moment - datetime.timedelta(days=moment.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
+
+def next_week_start(moment):
+    """Returns the Monday 00:00 UTC following moment, when a new team-meeting issue may appear."""
+    return week_start(moment) + datetime.timedelta(days=7)
+
+def cache_expiry(cached, now):
+    """
+    Returns when the cached issue has to be checked against GitHub again: the start of next
+    week if it is this week's issue, else soon, since this week's issue has not been created yet.
+    """
+    created_at = datetime.datetime.strptime(cached['created_at'], '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo=datetime.timezone.utc)
+    if created_at >= week_start(now):
+        return next_week_start(now).timestamp()
+    return now.timestamp() + STALE_ISSUE_TTL_SECONDS
+
+def load_cached_issue():
+    try:
+        with open(get_wu_cache_path()) as cache_file:
+            return json.load(cache_file)
+    except (FileNotFoundError, ValueError):
+        return None
+
+def save_cached_issue(cached):
+    os.makedirs(get_index_dir(), exist_ok=True)
+    tmp_path = get_wu_cache_path() + '.tmp'
+    with open(tmp_path, 'w') as cache_file:
+        json.dump(cached, cache_file)
+    os.replace(tmp_path, get_wu_cache_path())
+
+def fetch_latest_issue(since):
+    """Asks GitHub for the single newest team-meeting issue updated since the given timestamp."""
+    # Fetch issues with the `since` parameter and sorted by created date in descending order with label team-meeting.
+    # Only the newest issue is needed, so ask for a one-issue page and stop after it.
+    issues = iter_issues(
         "github",
         "premium-support",
         params={
-            "since": "2025-01-01T00:00:00Z",
+            "since": since,
             "sort": "created",
             "direction": "desc",
-            "labels": "team-meeting"
+            "labels": "team-meeting",
+            "per_page": 1
         }
     )
-    if success:
-        if issues and len(issues) > 0:
-            latest_weekly_update_issue = issues[0]
-            if get_params:
-                 questions_of_the_week = re.findall(r'(?:QOTW|BONUS QOTW):\s*"([^"]+)"', latest_weekly_update_issue["body"])
-                 comments_url = latest_weekly_update_issue["comments_url"]
-                 return questions_of_the_week, comments_url
-            else:
-                click.echo("🎉 Latest Team Meeting Issue found. Re-run with wu post to update.")
-                click.echo(f"🔗 Attempting to open: {latest_weekly_update_issue['html_url']}...")
-                webbrowser.open_new_tab(issues[0]["html_url"])
-                return [], ""
-        else:
-            raise HoustonError("No issues found for this week.")
-    else:
-        raise HoustonError(error)
+    latest_weekly_update_issue = next(issues, None)
+    issues.close()
+    return latest_weekly_update_issue
+
+def get_cached_weekly_update_issue(refresh=False):
+    """
+    Returns the latest team-meeting issue, its QOTW list and comments_url from the local cache.
+
+    This week's issue stays cached until the start of the next week; an issue from an earlier
+    week only for an hour, until this week's shows up. After that, or with refresh, one request
+    asks only for issues updated since the cached one was created, and the body is parsed again
+    only when a newer issue shows up or the cached one was edited.
+    """
+    import re
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cached = load_cached_issue()
+    if cached and not refresh and now.timestamp() < cached['expires_at']:
+        return cached
+    since = cached['created_at'] if cached else DEFAULT_SINCE
+    latest_weekly_update_issue = fetch_latest_issue(since)
+    if latest_weekly_update_issue is None and not cached:
+        raise HoustonError("No issues found for this week.")
+    if latest_weekly_update_issue and (not cached
+                                       or latest_weekly_update_issue["number"] != cached["number"]
+                                       or latest_weekly_update_issue.get("updated_at") != cached.get("updated_at")):
+        cached = {
+            "number": latest_weekly_update_issue["number"],
+            "created_at": latest_weekly_update_issue["created_at"],
+            "updated_at": latest_weekly_update_issue.get("updated_at"),
+            "html_url": latest_weekly_update_issue["html_url"],
+            "comments_url": latest_weekly_update_issue["comments_url"],
+            "questions_of_the_week": re.findall(r'(?:QOTW|BONUS QOTW):\s*"([^"]+)"', latest_weekly_update_issue["body"] or ""),
+        }
+    cached["expires_at"] = cache_expiry(cached, now)
+    save_cached_issue(cached)
+    return cached
+
+def get_latest_weekly_update_issue(get_params=False, refresh=False):
+    import webbrowser
+    latest_weekly_update_issue = get_cached_weekly_update_issue(refresh=refresh)
+    if get_params:
+        return latest_weekly_update_issue["questions_of_the_week"], latest_weekly_update_issue["comments_url"]
+    click.echo("🎉 Latest Team Meeting Issue found. Re-run with wu post to update.")
+    click.echo(f"🔗 Attempting to open: {latest_weekly_update_issue['html_url']}...")
+    webbrowser.open_new_tab(latest_weekly_update_issue["html_url"])
+    return [], ""
 
 if __name__ == "__main__":
     wu()
\ No newline at end of file
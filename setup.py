@@ -7,7 +7,7 @@ setup(
     packages=find_packages(),
     entry_points={
         'console_scripts': [
-            'gob=gob.cli:main',
+            'gob=gob.cli:run',
         ],
     },
 )
\ No newline at end of file
@@ -0,0 +1,12 @@
+import pytest
+from gob import index
+
+@pytest.fixture
+def home(tmp_path, monkeypatch):
+    """Points HOME, and with it ~/.gob, at an empty temporary directory with a fresh index."""
+    monkeypatch.setenv('HOME', str(tmp_path))
+    monkeypatch.setattr(index, '_connection', None)
+    monkeypatch.setattr(index, '_listings', {})
+    yield tmp_path
+    if index._connection is not None:
+        index._connection.close()
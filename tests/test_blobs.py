@@ -0,0 +1,62 @@
+import errno
+import os
+import pytest
+from gob import blobs
+
+@pytest.fixture
+def ticket(home):
+    path = os.path.join(home, '.gob', 'Acme', 'tickets', '101')
+    os.makedirs(path)
+    return path
+
+def write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as out_file:
+        out_file.write(content)
+
+def read(path):
+    with open(path) as in_file:
+        return in_file.read()
+
+def test_store_path_links_files_from_the_store(home, ticket):
+    write(os.path.join(home, 'foo.log'), 'one')
+    assert blobs.store_path(os.path.join(home, 'foo.log'), ticket) == (1, 0)
+    assert not os.path.exists(os.path.join(home, 'foo.log'))
+    assert read(os.path.join(ticket, 'foo.log')) == 'one'
+    assert os.stat(os.path.join(ticket, 'foo.log')).st_nlink == 2
+
+def test_store_path_refuses_an_existing_file(home, ticket):
+    write(os.path.join(ticket, 'foo.log'), 'one')
+    write(os.path.join(home, 'foo.log'), 'two')
+    with pytest.raises(FileExistsError):
+        blobs.store_path(os.path.join(home, 'foo.log'), ticket)
+    assert read(os.path.join(home, 'foo.log')) == 'two'
+    assert read(os.path.join(ticket, 'foo.log')) == 'one'
+    assert blobs.collect_garbage(dry_run=True) == (0, 0)
+
+def test_store_path_refuses_an_existing_directory(home, ticket):
+    write(os.path.join(ticket, 'logs', 'app.log'), 'one')
+    write(os.path.join(home, 'logs', 'app.log'), 'two')
+    with pytest.raises(FileExistsError):
+        blobs.store_path(os.path.join(home, 'logs'), ticket)
+    assert read(os.path.join(home, 'logs', 'app.log')) == 'two'
+    assert read(os.path.join(ticket, 'logs', 'app.log')) == 'one'
+
+@pytest.mark.parametrize('already_stored', [False, True])
+def test_failed_link_puts_the_file_back(home, ticket, monkeypatch, already_stored):
+    if already_stored:
+        write(os.path.join(home, 'copy.log'), 'one')
+        blobs.store_path(os.path.join(home, 'copy.log'), ticket)
+    write(os.path.join(home, 'foo.log'), 'one')
+    os.chmod(os.path.join(home, 'foo.log'), 0o640)
+
+    def failing_link(blob_path, dst):
+        raise OSError(errno.EIO, os.strerror(errno.EIO))
+
+    monkeypatch.setattr(blobs, 'link_blob', failing_link)
+    with pytest.raises(OSError):
+        blobs.store_path(os.path.join(home, 'foo.log'), ticket)
+    assert read(os.path.join(home, 'foo.log')) == 'one'
+    assert os.stat(os.path.join(home, 'foo.log')).st_mode & 0o777 == 0o640
+    assert not os.path.exists(os.path.join(ticket, 'foo.log'))
+    assert blobs.collect_garbage(dry_run=True)[0] == 0
@@ -0,0 +1,193 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import pytest
+from gob import gh_api_common
+from gob.gh_api_common import RequestScheduler
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.answer()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.answer()
+
+    def answer(self):
+        url = urlparse(self.path)
+        query = {name: values[0] for name, values in parse_qs(url.query).items()}
+        self.server.requests.append((self.command, url.path, query, dict(self.headers)))
+        status, headers, body = self.server.routes[url.path](query, self.headers)
+        payload = json.dumps(body).encode() if body is not None else b''
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+class StubGitHub(ThreadingHTTPServer):
+    """A local GitHub API: routes map a path to a function of (query, headers) returning (status, headers, body)."""
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), StubHandler)
+        self.routes = {}
+        self.requests = []
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_port}'
+
+def script(*responses):
+    """A route answering with responses in turn, repeating the last one."""
+    responses = list(responses)
+
+    def route(query, headers):
+        return responses.pop(0) if len(responses) > 1 else responses[0]
+
+    return route
+
+@pytest.fixture
+def github(home, monkeypatch):
+    server = StubGitHub()
+    thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.01}, daemon=True)
+    thread.start()
+    monkeypatch.setenv('GITHUB_API_URL', server.url)
+    monkeypatch.setenv('GITHUB_TOKEN', 'test-token')
+    monkeypatch.setattr(gh_api_common, '_client', None)
+    yield server
+    if gh_api_common._client is not None:
+        gh_api_common._client.session.close()
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def sleeps():
+    return []
+
+@pytest.fixture
+def client(github, sleeps):
+    client = gh_api_common.get_client()
+    client.scheduler = RequestScheduler(sleep=sleeps.append, clock=lambda: 1000)
+    return client
+
+def test_get_retries_server_errors_with_backoff(github, client, sleeps):
+    github.routes['/issue'] = script((502, {}, {}), (503, {}, {}), (200, {}, {'number': 1}))
+    assert client.get(f'{github.url}/issue') == (True, {'number': 1}, None)
+    assert len(github.requests) == 3
+    assert len(sleeps) == 2
+    assert 0 <= sleeps[0] <= 1 and 0 <= sleeps[1] <= 2
+    assert client.scheduler.waited == sum(sleeps)
+
+def test_get_gives_up_after_max_retries(github, client, sleeps):
+    client.scheduler.max_retries = 2
+    github.routes['/issue'] = script((503, {}, {'message': 'unavailable'}))
+    success, _, error = client.get(f'{github.url}/issue')
+    assert not success
+    assert error.startswith('Server error (503)')
+    assert len(github.requests) == 3
+
+def test_retry_after_is_honoured(github, client, sleeps):
+    github.routes['/issue'] = script((429, {'Retry-After': '7'}, {}), (200, {}, {'number': 1}))
+    assert client.get(f'{github.url}/issue') == (True, {'number': 1}, None)
+    assert sleeps == [7]
+
+def test_post_is_not_retried_on_server_error(github, client, sleeps):
+    github.routes['/comments'] = script((502, {}, {}), (201, {}, {'id': 1}))
+    success, _, _ = client.post(f'{github.url}/comments', {'body': 'hi'})
+    assert not success
+    assert len(github.requests) == 1
+    assert sleeps == []
+
+def test_exhausted_rate_limit_waits_for_reset(github, client, sleeps):
+    github.routes['/issue'] = script((200, {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': '1010'}, {'number': 1}))
+    client.get(f'{github.url}/issue')
+    assert sleeps == []
+    client.get(f'{github.url}/issue')
+    assert sleeps == [10]
+
+def test_not_modified_is_answered_from_cache(github, client):
+    def route(query, headers):
+        if headers.get('If-None-Match') == '"v1"':
+            return 304, {}, None
+        return 200, {'ETag': '"v1"'}, [{'number': 1}]
+
+    github.routes['/repos/octo/repo/issues'] = route
+    url = f'{github.url}/repos/octo/repo/issues'
+    assert client.get(url) == (True, [{'number': 1}], None)
+    # A fresh client, as in the next gob invocation, still revalidates against the on-disk cache
+    gh_api_common._client = None
+    assert gh_api_common.get_client().get(url) == (True, [{'number': 1}], None)
+    assert [headers.get('If-None-Match') for _, _, _, headers in github.requests] == [None, '"v1"']
+
+def test_cache_can_be_bypassed(github, client):
+    github.routes['/issue'] = script((200, {'ETag': '"v1"'}, {'number': 1}))
+    client.get(f'{github.url}/issue')
+    client.get(f'{github.url}/issue', use_cache=False)
+    assert [headers.get('If-None-Match') for _, _, _, headers in github.requests] == [None, None]
+
+def issue_pages(github, pages, with_last):
+    path = '/repos/octo/repo/issues'
+
+    def route(query, headers):
+        page = int(query.get('page', 1))
+        links = []
+        if page < pages:
+            links.append(f'<{github.url}{path}?per_page=2&page={page + 1}>; rel="next"')
+            if with_last:
+                links.append(f'<{github.url}{path}?per_page=2&page={pages}>; rel="last"')
+        issues = [{'number': (page - 1) * 2 + offset} for offset in (1, 2)]
+        return 200, {'Link': ', '.join(links)} if links else {}, issues
+
+    github.routes[path] = route
+
+@pytest.mark.parametrize('with_last', [True, False])
+def test_list_issues_follows_pagination(github, client, with_last):
+    issue_pages(github, 5, with_last)
+    success, issues, error = gh_api_common.list_issues('octo', 'repo', params={'per_page': 2})
+    assert (success, error) == (True, None)
+    assert [issue['number'] for issue in issues] == list(range(1, 11))
+    assert sorted(int(query.get('page', 1)) for _, _, query, _ in github.requests) == [1, 2, 3, 4, 5]
+
+def test_iter_issue_pages_stops_at_a_failed_page(github, client):
+    issue_pages(github, 5, True)
+    route = github.routes['/repos/octo/repo/issues']
+    github.routes['/repos/octo/repo/issues'] = lambda query, headers: (404, {}, {}) if query.get('page') == '3' else route(query, headers)
+    results = list(gh_api_common.iter_issue_pages('octo', 'repo', params={'per_page': 2}))
+    assert [success for success, _, _ in results] == [True, True, False]
+
+class FakeResponse:
+    def __init__(self, status_code=200, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+def test_pacing_reserves_slots_for_concurrent_requests():
+    sleeps = []
+    scheduler = RequestScheduler(sleep=sleeps.append, clock=lambda: 1000)
+    scheduler.record(FakeResponse(headers={'X-RateLimit-Remaining': '10', 'X-RateLimit-Reset': '1020'}))
+    threads = [threading.Thread(target=scheduler.pace) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # The first request goes out right away, the others one interval apart instead of together
+    assert sorted(sleeps) == pytest.approx([20 / 10, 20 / 10 + 20 / 9, 20 / 10 + 20 / 9 + 20 / 8])
+
+def test_pacing_delay_is_capped():
+    sleeps = []
+    scheduler = RequestScheduler(sleep=sleeps.append, clock=lambda: 1000)
+    scheduler.record(FakeResponse(headers={'X-RateLimit-Remaining': '49', 'X-RateLimit-Reset': '4600'}))
+    scheduler.pace()
+    scheduler.pace()
+    assert sleeps == [gh_api_common.MAX_PACING_SECONDS]
+
+def test_not_modified_does_not_use_up_a_call():
+    scheduler = RequestScheduler(sleep=lambda seconds: None, clock=lambda: 1000)
+    scheduler.record(FakeResponse(headers={'X-RateLimit-Remaining': '10', 'X-RateLimit-Reset': '1020'}))
+    scheduler.record(FakeResponse(304), scheduler.pace())
+    assert scheduler.remaining == 10
+    scheduler.record(FakeResponse(200), scheduler.pace())
+    assert scheduler.remaining == 9
@@ -0,0 +1,53 @@
+import os
+import shutil
+import pytest
+from gob import index
+
+@pytest.fixture
+def workspace(home):
+    gob_dir = os.path.join(home, '.gob')
+    for customer, ticket_id in [('Acme', '101'), ('Acme', '102'), ('Globex', '201')]:
+        os.makedirs(os.path.join(gob_dir, customer, 'tickets', ticket_id))
+    os.makedirs(os.path.join(gob_dir, '.solved', '301'))
+    return gob_dir
+
+@pytest.fixture
+def listed(monkeypatch):
+    """Records the directories the ticket-ID map lists."""
+    paths = []
+    list_directories = index.list_directories
+
+    def recording_list_directories(path):
+        paths.append(path)
+        return list_directories(path)
+
+    monkeypatch.setattr(index, 'list_directories', recording_list_directories)
+    return paths
+
+def test_locate_ticket_finds_open_and_solved_tickets(workspace):
+    assert index.locate_ticket('201') == ('Globex', 'open')
+    assert index.locate_ticket('301') == (None, 'solved')
+
+def test_unknown_id_does_not_list_unchanged_directories_again(workspace, listed):
+    assert index.locate_ticket('nope') is None
+    listed.clear()
+    assert index.locate_ticket('nope') is None
+    assert listed == [workspace]
+
+def test_rescan_lists_only_changed_customers(workspace, listed):
+    index.rescan_tickets()
+    os.makedirs(os.path.join(workspace, 'Globex', 'tickets', '202'))
+    listed.clear()
+    assert index.locate_ticket('202') == ('Globex', 'open')
+    assert os.path.join(workspace, 'Acme', 'tickets') not in listed
+
+def test_ticket_removed_outside_gob_is_healed(workspace):
+    assert index.locate_ticket('101') == ('Acme', 'open')
+    shutil.rmtree(os.path.join(workspace, 'Acme', 'tickets', '101'))
+    assert index.locate_ticket('101') is None
+    assert index.match_tickets('1*', 'open') == [('102', 'Acme')]
+
+def test_ticket_moved_to_another_customer_outside_gob(workspace):
+    assert index.locate_ticket('101') == ('Acme', 'open')
+    os.rename(os.path.join(workspace, 'Acme', 'tickets', '101'), os.path.join(workspace, 'Globex', 'tickets', '101'))
+    assert index.locate_ticket('101') == ('Globex', 'open')
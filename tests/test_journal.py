@@ -0,0 +1,105 @@
+import errno
+import os
+import pytest
+from click.testing import CliRunner
+from gob import journal
+from gob.cli import main
+
+def make_ticket(path, files=('notes.md', 'notes.sh', 'logs/app.log')):
+    for name in files:
+        os.makedirs(os.path.dirname(os.path.join(path, name)), exist_ok=True)
+        with open(os.path.join(path, name), 'w') as ticket_file:
+            ticket_file.write(name)
+
+def list_files(path):
+    return sorted(os.path.relpath(os.path.join(root, name), path) for root, _, files in os.walk(path) for name in files)
+
+@pytest.fixture
+def move(home):
+    """One journaled move of a ticket into .solved, with neither side created yet."""
+    gob_dir = os.path.join(home, '.gob')
+    os.makedirs(os.path.join(gob_dir, 'Acme', 'tickets'))
+    os.makedirs(os.path.join(gob_dir, '.solved'))
+    return {'src': os.path.join(gob_dir, 'Acme', 'tickets', '123'), 'dst': os.path.join(gob_dir, '.solved', '123'), 'done': False}
+
+def interrupted(*moves, **extra):
+    state = {'operation': 'solve', 'purge_dir': None, 'moves': list(moves), **extra}
+    journal._write_journal(state)
+    return journal.load_journal()
+
+@pytest.fixture
+def cross_device(monkeypatch):
+    """Makes every rename that is not the commit of a '.partial' copy fail with EXDEV."""
+    rename = os.rename
+
+    def fake_rename(src, dst):
+        if not src.endswith('.partial'):
+            raise OSError(errno.EXDEV, os.strerror(errno.EXDEV))
+        rename(src, dst)
+
+    monkeypatch.setattr(os, 'rename', fake_rename)
+
+def test_run_batch_moves_across_filesystems(move, cross_device):
+    make_ticket(move['src'])
+    assert journal.run_batch('solve', [(move['src'], move['dst'])]) == []
+    assert not os.path.exists(move['src'])
+    assert list_files(move['dst']) == ['logs/app.log', 'notes.md', 'notes.sh']
+    assert journal.load_journal() is None
+
+def test_resume_finishes_removing_src_after_commit(move):
+    # Interrupted after os.rename(partial, dst), while shutil.rmtree(src) was running
+    make_ticket(move['dst'])
+    make_ticket(move['src'], files=('logs/app.log',))
+    assert journal.resume_batch(interrupted(move)) == []
+    assert not os.path.exists(move['src'])
+    assert list_files(move['dst']) == ['logs/app.log', 'notes.md', 'notes.sh']
+    assert journal.load_journal() is None
+
+def test_resume_drops_partial_copy_and_moves_again(move, cross_device):
+    # Interrupted during shutil.copytree(src, partial)
+    make_ticket(move['src'])
+    make_ticket(move['dst'] + '.partial', files=('notes.md',))
+    assert journal.resume_batch(interrupted(move)) == []
+    assert not os.path.exists(move['src'])
+    assert not os.path.exists(move['dst'] + '.partial')
+    assert list_files(move['dst']) == ['logs/app.log', 'notes.md', 'notes.sh']
+    assert journal.load_journal() is None
+
+def test_rollback_after_commit_restores_src(move):
+    make_ticket(move['dst'])
+    make_ticket(move['src'], files=('logs/app.log',))
+    assert journal.rollback_batch(interrupted(move)) == []
+    assert not os.path.exists(move['dst'])
+    assert list_files(move['src']) == ['logs/app.log', 'notes.md', 'notes.sh']
+    assert journal.load_journal() is None
+
+def test_rollback_moves_back_done_moves_and_drops_partial_copies(move, home):
+    other = {'src': os.path.join(os.path.dirname(move['src']), '456'), 'dst': os.path.join(os.path.dirname(move['dst']), '456'), 'done': False}
+    make_ticket(move['dst'])
+    move['done'] = True
+    make_ticket(other['src'])
+    make_ticket(other['dst'] + '.partial', files=('notes.md',))
+    assert journal.rollback_batch(interrupted(move, other)) == []
+    for ticket in (move, other):
+        assert list_files(ticket['src']) == ['logs/app.log', 'notes.md', 'notes.sh']
+        assert not os.path.exists(ticket['dst'])
+    assert not os.path.exists(other['dst'] + '.partial')
+    assert journal.load_journal() is None
+
+def test_interrupted_rollback_keeps_restored_src(move):
+    # The rollback's own cross-filesystem move committed src, then stopped while removing dst
+    make_ticket(move['src'])
+    make_ticket(move['dst'], files=('notes.md',))
+    assert journal.rollback_batch(interrupted(move, rolling_back=True)) == []
+    assert not os.path.exists(move['dst'])
+    assert list_files(move['src']) == ['logs/app.log', 'notes.md', 'notes.sh']
+    assert journal.load_journal() is None
+
+def test_recover_does_not_resume_an_interrupted_rollback(move):
+    make_ticket(move['src'])
+    make_ticket(move['dst'], files=('notes.md',))
+    interrupted(move, rolling_back=True)
+    result = CliRunner().invoke(main, ['tx', 'recover'])
+    assert 'Run gob tx recover --rollback to finish it.' in result.output
+    assert list_files(move['src']) == ['logs/app.log', 'notes.md', 'notes.sh']
+    assert journal.load_journal() is not None
@@ -0,0 +1,55 @@
+import pytest
+from gob import outbox
+
+class FakeClient:
+    """Answers the marker check with get_result and records every POST."""
+    def __init__(self, get_result=(True, [], None), post_result=(True, {}, None)):
+        self.get_result = get_result
+        self.post_result = post_result
+        self.posts = []
+
+    def get(self, url, params=None, use_cache=True):
+        return self.get_result
+
+    def post(self, url, json_data):
+        self.posts.append(json_data)
+        return self.post_result
+
+@pytest.fixture
+def item(home):
+    return outbox.enqueue_comment('https://api.github.com/repos/octo/repo/issues/1/comments', 'Weekly update')
+
+def test_first_attempt_posts_without_checking(item):
+    client = FakeClient(get_result=(False, {}, 'Request failed: timed out'))
+    assert outbox.deliver(client, item)
+    assert client.posts == [{'body': item['body']}]
+    assert outbox.load_item(item['id']) is None
+
+def test_failed_post_stays_queued(item):
+    client = FakeClient(post_result=(False, {}, 'Request failed: timed out'))
+    assert not outbox.deliver(client, item)
+    queued = outbox.load_item(item['id'])
+    assert (queued['state'], queued['attempts'], queued['last_error']) == ('pending', 1, 'Request failed: timed out')
+
+def test_retry_skips_a_comment_that_already_landed(item):
+    item['attempts'] = 1
+    client = FakeClient(get_result=(True, [{'body': item['body']}], None))
+    assert outbox.deliver(client, item)
+    assert client.posts == []
+    assert outbox.load_item(item['id']) is None
+
+def test_retry_posts_when_the_comment_is_missing(item):
+    item['attempts'] = 1
+    client = FakeClient(get_result=(True, [{'body': 'Someone else'}], None))
+    assert outbox.deliver(client, item)
+    assert len(client.posts) == 1
+
+def test_retry_does_not_post_when_the_check_fails(item):
+    item['attempts'] = 1
+    outbox.save_item(item)
+    client = FakeClient(get_result=(False, {}, 'Request failed: timed out'))
+    assert not outbox.deliver(client, item)
+    assert client.posts == []
+    queued = outbox.load_item(item['id'])
+    assert (queued['state'], queued['attempts']) == ('pending', 1)
+    assert queued['last_error'] == 'Could not check for an earlier delivery: Request failed: timed out'
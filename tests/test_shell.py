@@ -0,0 +1,15 @@
+import os
+from gob import shell
+
+def test_run_command_survives_unexpected_errors(home, monkeypatch, capsys):
+    assert shell.run_command(['cx', 'add', '-c', 'acme']) == 0
+
+    def failing_makedirs(*args, **kwargs):
+        raise PermissionError(13, 'Permission denied', 'tickets')
+
+    with monkeypatch.context() as patch:
+        patch.setattr(os, 'makedirs', failing_makedirs)
+        assert shell.run_command(['tx', 'add', '-c', 'acme', '101']) == 1
+    assert "🔴 Error: PermissionError: [Errno 13] Permission denied: 'tickets'" in capsys.readouterr().err
+    assert shell.run_command(['cx', 'ls']) == 0
+    assert 'Acme' in capsys.readouterr().out